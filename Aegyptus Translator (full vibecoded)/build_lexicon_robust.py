@@ -3,64 +3,140 @@ import json
 import re
 import unicodedata
 from collections import defaultdict
+from dataclasses import dataclass, fields, is_dataclass
+from functools import lru_cache
+from multiprocessing import Pool
+
+from fast_json import orjson, loads as _json_loads
+
+# ----------------------------
+# Precompiled patterns
+# ----------------------------
+
+# Inline Gardiner tags such as <g>V31Aa</g>
+_GTAG_SPLIT_RE = re.compile(r"(<g>.*?</g>)")
+_GTAG_FULL_RE = re.compile(r"<g>\s*(.+?)\s*</g>")
+
+# One cluster of a hieroglyphic word: <g> tag, bare Gardiner code or single character
+_CLUSTER_RE = re.compile(r"<g>.*?</g>|[A-Z]{1,2}[0-9]{1,3}[A-Za-z]*|.")
+
+# Whole-sentence scanner: whitespace | <g> tag | bare Gardiner code | single character
+_SENT_RE = re.compile(r"(\s+)|(<g>\S*?</g>)|([A-Z]{1,2}[0-9]{1,3}[A-Za-z]*)|(.)", re.S)
+
+# Splits the last word of a Unicode sign name ("A001", "AA012", "V031A")
+# into series letters, number and variant suffix
+_GARDINER_NAME_RE = re.compile(r"([A-Za-z]+)(\d+)([A-Za-z]*)$")
+
+# Unicode categories treated as invisible (combining marks, format controls)
+_SKIP_CATS = frozenset(("Mn", "Cf"))
+
+# Matches things like "A1", "Aa12", "V31Aa", "Z2", etc.
+GARDINER_PATTERN = re.compile(r"^[A-Z][0-9]+[A-Za-z]*$")
 
 # ----------------------------
 # Helper functions
 # ----------------------------
 
+def _nfc(s: str) -> str:
+    """NFC-normalize s; ASCII strings are already normalized and returned as is."""
+    if s.isascii():
+        return s
+    return unicodedata.normalize("NFC", s)
+
+@lru_cache(maxsize=65536)
 def parse_translit_affixes(translit: str):
     """
     Extract prefixes and suffixes from transliteration without modifying original translit.
-    Returns (prefixes, suffixes)
+    Prefixes are leading "(x)" groups, suffixes trailing ".x" / "=x" groups.
+    Returns (prefixes, suffixes) as tuples; results are cached, so they must stay immutable.
     """
     prefixes = []
     suffixes = []
-    temp = translit
+    start, end = 0, len(translit)
 
-    # Extract all leading prefixes
-    while True:
-        m = re.match(r"^\([^\)]+\)", temp)
-        if not m:
+    # Extract all leading prefixes: "(" + at least one non-")" char + ")"
+    while start < end and translit[start] == "(":
+        close = translit.find(")", start + 2)
+        if close == -1 or translit[start + 1] == ")":
             break
-        prefixes.append(m.group(0))
-        temp = temp[len(m.group(0)):]
+        prefixes.append(translit[start:close + 1])
+        start = close + 1
 
-    # Extract all trailing suffixes
+    # Extract all trailing suffixes: "." or "=" followed by a run without separators
     while True:
-        m = re.search(r"(\.|=)[^\s\.\=]+$", temp)
-        if not m:
+        i = end
+        while i > start and translit[i - 1] not in ".=" and not translit[i - 1].isspace():
+            i -= 1
+        if i == end or i == start or translit[i - 1] not in ".=":
             break
-        suffixes.insert(0, m.group(0))
-        temp = temp[:-len(m.group(0))]
+        suffixes.append(translit[i - 1:end])
+        end = i - 1
+
+    suffixes.reverse()
+    return tuple(prefixes), tuple(suffixes)
+
+def _gardiner_from_name(name: str) -> str:
+    """Build a Gardiner code from an "EGYPTIAN HIEROGLYPH ..." Unicode name."""
+    code = name.split(" ")[-1]
+    m = _GARDINER_NAME_RE.match(code)
+    if m:
+        # All letters, then the number without leading zeros: V031A -> "VA31",
+        # the format the shipped lexicon data uses
+        return m.group(1) + m.group(3) + m.group(2).lstrip("0")
+    # Format controls and other non-numbered names (e.g. "JOINER")
+    letter = ''.join(filter(str.isalpha, code))
+    number = ''.join(filter(str.isdigit, code)).lstrip("0")
+    return f"{letter}{number}"
+
+def _build_gardiner_table():
+    """Map every named character of the Egyptian Hieroglyphs block (U+13000..U+1345F) to its code."""
+    table = {}
+    for cp in range(0x13000, 0x13460):
+        c = chr(cp)
+        name = unicodedata.name(c, "")
+        if name.startswith("EGYPTIAN HIEROGLYPH"):
+            table[c] = _gardiner_from_name(name)
+    return table
 
-    return prefixes, suffixes
+# Precomputed once at import; characters outside the block go through _char_to_gardiner
+_GARDINER_TABLE = _build_gardiner_table()
 
 def unicode_to_gardiner(cluster: str):
     """Convert one or more Unicode hieroglyphs to Gardiner codes."""
     codes = []
+    table_get = _GARDINER_TABLE.get
     for c in cluster:
+        code = table_get(c)
+        if code is not None:
+            codes.append(code)
+            continue
         try:
             name = unicodedata.name(c)
         except ValueError:
             codes.append(f"UNK({c})")
             continue
         if name.startswith("EGYPTIAN HIEROGLYPH"):
-            code = name.split(" ")[-1]
-            letter = ''.join(filter(str.isalpha, code))
-            number = ''.join(filter(str.isdigit, code)).lstrip("0")
-            codes.append(f"{letter}{number}")
+            codes.append(_gardiner_from_name(name))
         else:
             codes.append(f"UNK({c})")
     return codes
 
-import re
-import unicodedata
-
-import re
-import unicodedata
-
-# Matches things like "A1", "Aa12", "V31Aa", "Z2", etc.
-GARDINER_PATTERN = re.compile(r"^[A-Z][0-9]+[A-Za-z]*$")
+@lru_cache(maxsize=None)
+def _char_to_gardiner(c: str):
+    """
+    Convert a single character to its Gardiner code.
+    Returns None for whitespace and UNK(<c>) for anything that is not
+    an Egyptian hieroglyph. Cached: the corpus reuses a small sign inventory.
+    """
+    if c.isspace():
+        return None
+    try:
+        name = unicodedata.name(c)
+    except ValueError:
+        return f"UNK({c})"
+    if name.startswith("EGYPTIAN HIEROGLYPH"):
+        return _gardiner_from_name(name)
+    return f"UNK({c})"
 
 def glyph_to_gardiner(glyph: str):
     """
@@ -68,20 +144,20 @@ def glyph_to_gardiner(glyph: str):
     into a flattened list of Gardiner codes.
     Handles embedded <g>…</g> anywhere in the glyph.
     """
-    glyph = glyph.strip()
+    glyph = _nfc(glyph).strip()
     if not glyph:
         return []
 
     gardiners = []
 
     # Replace inline <g>...</g> sections with placeholders
-    parts = re.split(r"(<g>.*?</g>)", glyph)
+    parts = _GTAG_SPLIT_RE.split(glyph)
 
     for part in parts:
         if not part.strip():
             continue
         # Handle Gardiner tags first
-        m = re.fullmatch(r"<g>\s*(.+?)\s*</g>", part)
+        m = _GTAG_FULL_RE.fullmatch(part)
         if m:
             val = m.group(1).strip()
             # Keep known Gardiner codes or placeholders like (unidentified)
@@ -90,21 +166,12 @@ def glyph_to_gardiner(glyph: str):
             continue
 
         # Otherwise, treat as Unicode hieroglyphs
+        table_get = _GARDINER_TABLE.get
+        char_to_gardiner = _char_to_gardiner
         for c in part:
-            try:
-                name = unicodedata.name(c)
-                if name.startswith("EGYPTIAN HIEROGLYPH"):
-                    code = name.split(" ")[-1]
-                    letter = ''.join(filter(str.isalpha, code))
-                    number = ''.join(filter(str.isdigit, code)).lstrip("0")
-                    gardiners.append(f"{letter}{number}")
-                else:
-                    # skip empty or private use characters
-                    if not name.startswith("<") and c.strip():
-                        gardiners.append(f"UNK({c})")
-            except ValueError:
-                if c.strip():
-                    gardiners.append(f"UNK({c})")
+            code = table_get(c) or char_to_gardiner(c)
+            if code is not None:
+                gardiners.append(code)
 
     # Filter out empty or null UNK()
     gardiners = [g for g in gardiners if g != "UNK()" and g != "UNK(︂)"]
@@ -117,24 +184,17 @@ def _unicode_segment_to_gardiner(segment: str):
     Unknowns are returned as UNK(<symbol>), ignoring invisible/control marks.
     """
     codes = []
-    for c in segment:
+    table_get = _GARDINER_TABLE.get
+    char_to_gardiner = _char_to_gardiner
+    category = unicodedata.category
+    skip_cats = _SKIP_CATS
+    for c in _nfc(segment):
         # Treat invisible or control characters as empty
-        if c.isspace() or unicodedata.category(c) in ["Mn", "Cf"]:
-            continue
-
-        try:
-            name = unicodedata.name(c)
-        except ValueError:
-            codes.append(f"UNK({c})")
+        if category(c) in skip_cats:
             continue
-
-        if name.startswith("EGYPTIAN HIEROGLYPH"):
-            code_part = name.split(" ")[-1]
-            letter = ''.join(filter(str.isalpha, code_part))
-            number = ''.join(filter(str.isdigit, code_part)).lstrip("0")
-            codes.append(f"{letter}{number}")
-        else:
-            codes.append(f"UNK({c})")
+        code = table_get(c) or char_to_gardiner(c)
+        if code is not None:
+            codes.append(code)
     return codes
 
 def split_sentence_preserve_words(sentence: str):
@@ -147,93 +207,210 @@ def split_sentence_preserve_words(sentence: str):
     words = sentence.strip().split()
     sentence_words = []
     for word in words:
-        clusters = re.findall(
-            r"<g>.*?</g>|[A-Z]{1,2}[0-9]{1,3}[A-Za-z]*|.", word
-        )
+        clusters = _CLUSTER_RE.findall(word)
         sentence_words.append(clusters)
     return sentence_words
 
 
 def sentence_to_gardiner_words(sentence: str):
-    """Convert a hieroglyphic sentence into a list of lists of Gardiner codes (flattened)."""
-    words_clusters = split_sentence_preserve_words(sentence)
+    """
+    Convert a hieroglyphic sentence into a list of lists of Gardiner codes (flattened).
+    Scans the sentence once with _SENT_RE; equivalent to running glyph_to_gardiner
+    over split_sentence_preserve_words.
+    """
     sentence_gardiner = []
-    for word in words_clusters:
-        codes = []
-        for g in word:
-            codes.extend(glyph_to_gardiner(g))  # flatten
-        sentence_gardiner.append(codes)
+    codes = None  # codes of the word being built, None between words
+    table_get = _GARDINER_TABLE.get
+    char_to_gardiner = _char_to_gardiner
+    for m in _SENT_RE.finditer(_nfc(sentence)):
+        kind = m.lastindex
+        if kind == 1:
+            codes = None
+            continue
+        if codes is None:
+            codes = []
+            sentence_gardiner.append(codes)
+
+        if kind == 4:
+            c = m.group(4)
+            code = table_get(c) or char_to_gardiner(c)
+            if code is not None and code != "UNK(︂)":
+                codes.append(code)
+        elif kind == 2:
+            tag = m.group(2)
+            val = tag[3:-4]
+            if val:
+                codes.append(val.upper())
+            else:
+                # Empty <g></g>: glyph_to_gardiner treats it as plain characters
+                codes.extend(f"UNK({c})" for c in tag)
+        else:
+            # Bare code such as D36: glyph_to_gardiner maps it character by character
+            codes.extend(f"UNK({c})" for c in m.group(3))
     return sentence_gardiner
 
+# ----------------------------
+# Lexicon records
+# ----------------------------
+
+@dataclass(frozen=True, slots=True)
+class Variant:
+    """One glyph spelling of a lemma. Hashable, so it doubles as its own dedupe key."""
+    glyph: str
+    translit: str
+    prefixes: tuple
+    suffixes: tuple
+    gardiner: tuple
+    gloss: str
+
+@dataclass(slots=True)
+class Example:
+    """A corpus sentence in which a lemma occurs."""
+    sentence_hiero: str
+    sentence_translit: str
+    sentence_upos: str
+    sentence_gloss: str
+    sentence_gardiner: list
+    translation: str
+    dateNotBefore: str
+    dateNotAfter: str
+
+# ----------------------------
+# Output helpers
+# ----------------------------
+
+def _json_default(obj):
+    """json fallback for the record dataclasses (orjson serializes them natively)."""
+    if is_dataclass(obj):
+        return {f.name: getattr(obj, f.name) for f in fields(obj)}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _dump_json(obj, output_path: str):
+    """Write obj as indented UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        with open(output_path, "wb") as out_f:
+            out_f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(output_path, "w", encoding="utf-8") as out_f:
+            json.dump(obj, out_f, ensure_ascii=False, indent=2, default=_json_default)
+
+def _dump_jsonl(lexicon: dict, output_path: str):
+    """Write one lemma per line: {"lemma_id": ..., **entry}."""
+    with open(output_path, "wb") as out_f:
+        for lemma_id, entry in lexicon.items():
+            record = {"lemma_id": lemma_id, **entry}
+            if orjson is not None:
+                out_f.write(orjson.dumps(record))
+            else:
+                out_f.write(json.dumps(record, ensure_ascii=False, default=_json_default).encode("utf-8"))
+            out_f.write(b"\n")
+
 # ----------------------------
 # Lexicon builder (flatten glyphs)
 # ----------------------------
 
-def build_lexicon(jsonl_path: str, output_path: str):
+def _process_line(line):
+    """
+    Parse one corpus line into (example, updates) for build_lexicon.
+    updates holds one (lemma_id, upos, variant) tuple per lemmatized token. Runs in worker processes, so it must stay
+    at module level and free of shared state.
+    """
+    data = _json_loads(line)
+    hiero_sentence = data["hieroglyphs"].split()
+    translit_tokens = data["transliteration"].split()
+    upos_tokens = data["UPOS"].split()
+    lemmatization_tokens = data.get("lemmatization", "").split()
+    gloss_tokens = data.get("glossing", "").split()
+
+    sentence_gardiner = sentence_to_gardiner_words(data["hieroglyphs"])
+
+    updates = []
+    for i, lemma_entry in enumerate(lemmatization_tokens):
+        if "|" not in lemma_entry:
+            continue
+        lemma_id, _ = lemma_entry.split("|")
+        glyph = hiero_sentence[i] if i < len(hiero_sentence) else ""
+        translit = translit_tokens[i] if i < len(translit_tokens) else ""
+        upos = upos_tokens[i] if i < len(upos_tokens) else ""
+        gloss = gloss_tokens[i] if i < len(gloss_tokens) else ""
+
+        prefixes, suffixes = parse_translit_affixes(translit)
+
+        gardiner_codes = glyph_to_gardiner(glyph)
+
+        # Only store single glyph per variant
+        variant = Variant(glyph, translit, prefixes, suffixes,
+                          tuple(gardiner_codes), gloss)
+        updates.append((lemma_id, upos, variant))
+
+    if not updates:
+        return None, updates
+
+    example = Example(
+        sentence_hiero=data["hieroglyphs"],
+        sentence_translit=data["transliteration"],
+        sentence_upos=data["UPOS"],
+        sentence_gloss=data.get("glossing", ""),
+        sentence_gardiner=sentence_gardiner,
+        translation=data.get("translation", ""),
+        dateNotBefore=data.get("dateNotBefore", ""),
+        dateNotAfter=data.get("dateNotAfter", "")
+    )
+    return example, updates
+
+def build_lexicon(jsonl_path: str, output_path: str, jsonl_output: bool = False,
+                  processes: int = None, chunksize: int = 256):
+    """
+    Aggregate the corpus into a lemma-keyed lexicon and save it to output_path.
+    With jsonl_output=True the lexicon is written one lemma per line instead of
+    as a single indented JSON object.
+
+    Lines are parsed in a multiprocessing pool (processes=None uses every core,
+    processes=1 runs in-process) and merged here in corpus order, so the
+    output does not depend on the number of workers.
+    """
     lexicon = defaultdict(lambda: {
         "lemma": "",
         "upos": "",
         "gloss": "",
         "glyph_variants": [],
-        "examples": []
+        "examples": [],
+        "_seen": set()  # Variants already in glyph_variants, dropped before saving
     })
 
-    with open(jsonl_path, "r", encoding="utf-8") as f:
-        for line in f:
-            data = json.loads(line)
-            hiero_sentence = data["hieroglyphs"].split()
-            translit_tokens = data["transliteration"].split()
-            upos_tokens = data["UPOS"].split()
-            lemmatization_tokens = data.get("lemmatization", "").split()
-            gloss_tokens = data.get("glossing", "").split()
-
-            sentence_gardiner = sentence_to_gardiner_words(data["hieroglyphs"])
-
-            for i, lemma_entry in enumerate(lemmatization_tokens):
-                if "|" not in lemma_entry:
-                    continue
-                lemma_id, _ = lemma_entry.split("|")
-                glyph = hiero_sentence[i] if i < len(hiero_sentence) else ""
-                translit = translit_tokens[i] if i < len(translit_tokens) else ""
-                upos = upos_tokens[i] if i < len(upos_tokens) else ""
-                gloss = gloss_tokens[i] if i < len(gloss_tokens) else ""
-
-                prefixes, suffixes = parse_translit_affixes(translit)
-
-                gardiner_codes = glyph_to_gardiner(glyph)
-
-                entry = lexicon[lemma_id]
-                entry["lemma"] = translit
-                entry["upos"] = upos
-                entry["gloss"] = gloss
-
-                # Only store single glyph per variant
-                variant = {
-                    "glyph": glyph,
-                    "translit": translit,
-                    "prefixes": prefixes,
-                    "suffixes": suffixes,
-                    "gardiner": gardiner_codes,
-                    "gloss": gloss
-                }
-
-                if variant not in entry["glyph_variants"]:
-                    entry["glyph_variants"].append(variant)
-
-                example = {
-                    "sentence_hiero": data["hieroglyphs"],
-                    "sentence_translit": data["transliteration"],
-                    "sentence_upos": data["UPOS"],
-                    "sentence_gloss": data.get("glossing", ""),
-                    "sentence_gardiner": sentence_gardiner,
-                    "translation": data.get("translation", ""),
-                    "dateNotBefore": data.get("dateNotBefore", ""),
-                    "dateNotAfter": data.get("dateNotAfter", "")
-                }
-                entry["examples"].append(example)
-
-    with open(output_path, "w", encoding="utf-8") as out_f:
-        json.dump(lexicon, out_f, ensure_ascii=False, indent=2)
+    with open(jsonl_path, "rb") as f:
+        if processes == 1:
+            pool = None
+            results = map(_process_line, f)
+        else:
+            pool = Pool(processes)
+            results = pool.imap(_process_line, f, chunksize=chunksize)
+
+        try:
+            for example, updates in results:
+                for lemma_id, upos, variant in updates:
+                    entry = lexicon[lemma_id]
+                    entry["lemma"] = variant.translit
+                    entry["upos"] = upos
+                    entry["gloss"] = variant.gloss
+
+                    seen = entry["_seen"]
+                    if variant not in seen:
+                        seen.add(variant)
+                        entry["glyph_variants"].append(variant)
+
+                    entry["examples"].append(example)
+        finally:
+            if pool is not None:
+                pool.terminate()
+
+    for entry in lexicon.values():
+        del entry["_seen"]
+
+    if jsonl_output:
+        _dump_jsonl(lexicon, output_path)
+    else:
+        _dump_json(lexicon, output_path)
 
     print(f"Lexicon saved to {output_path}")
 
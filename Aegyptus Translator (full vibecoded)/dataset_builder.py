@@ -1,69 +1,117 @@
 # dataset_builder_word_subword.py
 import json
+import os
+from multiprocessing import Pool
 from tqdm import tqdm
 from hieroglyph_tokenizer import HieroglyphTokenizer
 from typing import List, Dict
 
+from fast_json import orjson, loads as _json_loads
+
+
+def _json_dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+# Per-process state for the worker pool (set by _init_worker)
+_worker_tokenizer = None
+_worker_direction = None
+
+
+def _init_worker(tokenizer: HieroglyphTokenizer, direction: str):
+    global _worker_tokenizer, _worker_direction
+    _worker_tokenizer = tokenizer
+    _worker_direction = direction
+
+
+def _process_line(line: bytes):
+    """
+    Build one dataset example from a raw corpus line.
+    Returns (bytes consumed, UTF-8 encoded example or None if the line is skipped).
+    """
+    tokenizer = _worker_tokenizer
+    data = _json_loads(line)
+    hiero_sentence = data.get("hieroglyphs", "").strip()
+    german_sentence = data.get("translation", "").strip()
+
+    if not hiero_sentence or not german_sentence:
+        return len(line), None
+
+    # --- Tokenize hieroglyphs word-by-word and subword level ---
+    hg_words_tokens = [tokenizer.tokenize_hieroglyphs(word) for word in hiero_sentence.split()]
+    hg_sentence_tokens = [tok for word in hg_words_tokens for tok in word]
+    hg_sentence_string = tokenizer.tokens_to_string(hg_sentence_tokens)
+
+    # --- Tokenize German sentence word-wise ---
+    de_words = german_sentence.split()
+    de_sentence_string = " ".join(de_words)
+
+    # Build dataset example
+    if _worker_direction == "hg2de":
+        input_text = hg_sentence_string
+        output_text = de_sentence_string
+    else:
+        input_text = de_sentence_string
+        output_text = hg_sentence_string
+
+    example = {
+        "input_text": input_text,
+        "output_text": output_text,
+        "metadata": {
+            "hieroglyph_sentence": hiero_sentence,
+            "german_sentence": german_sentence,
+            "upos": data.get("UPOS", ""),
+            "gloss": data.get("glossing", ""),
+            "lemmatization": data.get("lemmatization", "")
+        }
+    }
+    return len(line), _json_dumps(example)
+
+
 class WordSubwordDatasetBuilder:
     def __init__(self, lexicon_path: str):
         self.tokenizer = HieroglyphTokenizer(lexicon_path)
 
-    def build_dataset(self, jsonl_path: str, output_path: str, direction: str = "hg2de"):
+    def build_dataset(self, jsonl_path: str, output_path: str, direction: str = "hg2de",
+                      processes: int = None, chunksize: int = 64):
         """
         Build dataset with full sentence input/output, but word/subword tokenized.
+        Lines are tokenized in a multiprocessing pool (processes=1 runs in-process);
+        examples are written in corpus order.
         """
-        dataset = []
-
-        # Count lines for tqdm
-        with open(jsonl_path, "r", encoding="utf-8") as f:
-            total_lines = sum(1 for _ in f)
-
-        with open(jsonl_path, "r", encoding="utf-8") as f, \
-             open(output_path, "w", encoding="utf-8") as out_f:
-
-            for line in tqdm(f, total=total_lines, desc="Building dataset"):
-                data = json.loads(line)
-                hiero_sentence = data.get("hieroglyphs", "").strip()
-                german_sentence = data.get("translation", "").strip()
-
-                if not hiero_sentence or not german_sentence:
-                    continue
-
-                # --- Tokenize hieroglyphs word-by-word and subword level ---
-                hg_words_tokens = [self.tokenizer.tokenize_hieroglyphs(word) for word in hiero_sentence.split()]
-                hg_sentence_tokens = [tok for word in hg_words_tokens for tok in word]
-                hg_sentence_string = self.tokenizer.tokens_to_string(hg_sentence_tokens)
-
-                # --- Tokenize German sentence word-wise ---
-                de_words = german_sentence.split()
-                de_sentence_string = " ".join(de_words)
-
-                # Build dataset example
-                if direction == "hg2de":
-                    input_text = hg_sentence_string
-                    output_text = de_sentence_string
-                elif direction == "de2hg":
-                    input_text = de_sentence_string
-                    output_text = hg_sentence_string
-                else:
-                    raise ValueError(f"Unknown direction {direction}")
-
-                example = {
-                    "input_text": input_text,
-                    "output_text": output_text,
-                    "metadata": {
-                        "hieroglyph_sentence": hiero_sentence,
-                        "german_sentence": german_sentence,
-                        "upos": data.get("UPOS", ""),
-                        "gloss": data.get("glossing", ""),
-                        "lemmatization": data.get("lemmatization", "")
-                    }
-                }
-
-                out_f.write(json.dumps(example, ensure_ascii=False) + "\n")
-                dataset.append(example)
-
-        print(f"Dataset saved to {output_path}, {len(dataset)} examples")
+        if direction not in ("hg2de", "de2hg"):
+            raise ValueError(f"Unknown direction {direction}")
+
+        # Progress is tracked in bytes so the input is only read once
+        total_bytes = os.path.getsize(jsonl_path)
+        n_examples = 0
+
+        with open(jsonl_path, "rb") as f, \
+             open(output_path, "wb") as out_f, \
+             tqdm(total=total_bytes, unit="B", unit_scale=True, desc="Building dataset") as pbar:
+
+            if processes == 1:
+                pool = None
+                _init_worker(self.tokenizer, direction)
+                results = map(_process_line, f)
+            else:
+                pool = Pool(processes, initializer=_init_worker, initargs=(self.tokenizer, direction))
+                results = pool.imap(_process_line, f, chunksize=chunksize)
+
+            try:
+                for n_bytes, example_json in results:
+                    pbar.update(n_bytes)
+                    if example_json is None:
+                        continue
+                    out_f.write(example_json)
+                    out_f.write(b"\n")
+                    n_examples += 1
+            finally:
+                if pool is not None:
+                    pool.terminate()
+
+        print(f"Dataset saved to {output_path}, {n_examples} examples")
 
 
 # ----------------------------
@@ -0,0 +1,12 @@
+"""
+JSON loading shared by the translator scripts: orjson when it is installed,
+the standard library otherwise. `loads` takes str or the raw bytes of a line.
+"""
+import json
+
+try:
+    import orjson  # optional: much faster JSON (de)serialization
+except ImportError:
+    orjson = None
+
+loads = orjson.loads if orjson is not None else json.loads
@@ -1,4 +1,5 @@
 import json
+import numpy as np
 import torch
 from torch.utils.data import Dataset, DataLoader
 from tqdm import tqdm
@@ -20,34 +21,45 @@ german_vocab_size = german_tokenizer.get_vocab_size()
 # Dataset class
 # ----------------------------
 class AegyptusDataset(Dataset):
+    """
+    Tokenizes every example once up front and keeps only the id arrays,
+    so __getitem__ is a zero-copy torch.from_numpy per field.
+    """
     def __init__(self, jsonl_path):
-        self.data = []
+        self._src_tokens = []
+        self._src_pos = []
+        self._tgt_input = []
+        self._tgt_output = []
+        token_to_id = hiero_tokenizer.token_to_id
+        pos_to_id = hiero_tokenizer.pos_to_id
+
         with open(jsonl_path, "r", encoding="utf-8") as f:
             for line in f:
-                self.data.append(json.loads(line))
-
-    def __len__(self):
-        return len(self.data)
+                item = json.loads(line)
+                hiero_sentence = item["input_text"]
+                german_sentence = item["output_text"]
 
-    def __getitem__(self, idx):
-        item = self.data[idx]
-        print(item)
-        hiero_sentence = item["input_text"]
-        german_sentence = item["output_text"]
+                # --- source ---
+                tokens = hiero_tokenizer.tokenize_hieroglyphs(hiero_sentence)
+                src_tokens = [token_to_id.get(t.token, 0) for t in tokens]
+                src_pos = [pos_to_id.get(t.upos, 0) for t in tokens]
 
-        # --- source ---
-        tokens = hiero_tokenizer.tokenize_hieroglyphs(hiero_sentence)
-        src_tokens = [hiero_tokenizer.token_to_id.get(t["token"], 0) for t in tokens]
-        src_pos = [hiero_tokenizer.pos_to_id.get(t["upos"], 0) for t in tokens]
+                # --- target ---
+                tgt_tokens = german_tokenizer.encode(german_sentence).ids
 
-        # --- target ---
-        tgt_tokens = german_tokenizer.encode(german_sentence).ids
+                # Teacher forcing: decoder input is tgt_tokens[:-1], output is tgt_tokens[1:]
+                # int64 because the embeddings and CrossEntropyLoss expect LongTensors
+                self._src_tokens.append(np.asarray(src_tokens, dtype=np.int64))
+                self._src_pos.append(np.asarray(src_pos, dtype=np.int64))
+                self._tgt_input.append(np.asarray(tgt_tokens[:-1], dtype=np.int64))
+                self._tgt_output.append(np.asarray(tgt_tokens[1:], dtype=np.int64))
 
-        # Teacher forcing: decoder input is tgt_tokens[:-1], output is tgt_tokens[1:]
-        tgt_input = tgt_tokens[:-1]
-        tgt_output = tgt_tokens[1:]
+    def __len__(self):
+        return len(self._src_tokens)
 
-        return torch.tensor(src_tokens), torch.tensor(src_pos), torch.tensor(tgt_input), torch.tensor(tgt_output)
+    def __getitem__(self, idx):
+        return (torch.from_numpy(self._src_tokens[idx]), torch.from_numpy(self._src_pos[idx]),
+                torch.from_numpy(self._tgt_input[idx]), torch.from_numpy(self._tgt_output[idx]))
 
 # ----------------------------
 # Collate function for padding
@@ -64,7 +76,8 @@ def collate_fn(batch):
 # DataLoader
 # ----------------------------
 dataset = AegyptusDataset("dataset_word_subword_hg2de.jsonl")
-train_loader = DataLoader(dataset, batch_size=8, shuffle=True, collate_fn=collate_fn)
+train_loader = DataLoader(dataset, batch_size=8, shuffle=True, collate_fn=collate_fn,
+                          pin_memory=torch.cuda.is_available())
 
 # ----------------------------
 # Model
@@ -82,7 +95,10 @@ model.to(device)
 # ----------------------------
 # Optimizer & loss
 # ----------------------------
-optimizer = torch.optim.Adam(model.parameters(), lr=1e-4)
+use_amp = device.type == "cuda"
+amp_dtype = torch.bfloat16 if use_amp and torch.cuda.is_bf16_supported() else torch.float16
+scaler = torch.amp.GradScaler('cuda', enabled=use_amp and amp_dtype == torch.float16)
+optimizer = torch.optim.Adam(model.parameters(), lr=1e-4, fused=use_amp)
 criterion = torch.nn.CrossEntropyLoss(ignore_index=-100)
 
 # ----------------------------
@@ -101,15 +117,18 @@ for epoch in range(epochs):
         tgt_output = tgt_output.to(device)
 
         optimizer.zero_grad()
-        logits = model(src_tokens, src_pos, tgt_input)  # shape: [B, T, vocab_size]
+        with torch.autocast(device_type=device.type, dtype=amp_dtype, enabled=use_amp):
+            logits = model(src_tokens, src_pos, tgt_input)  # shape: [B, T, vocab_size]
+
+            # reshape for CE loss
+            logits_flat = logits.view(-1, logits.size(-1))
+            tgt_output_flat = tgt_output.view(-1)
 
-        # reshape for CE loss
-        logits_flat = logits.view(-1, logits.size(-1))
-        tgt_output_flat = tgt_output.view(-1)
+            loss = criterion(logits_flat, tgt_output_flat)
 
-        loss = criterion(logits_flat, tgt_output_flat)
-        loss.backward()
-        optimizer.step()
+        scaler.scale(loss).backward()
+        scaler.step(optimizer)
+        scaler.update()
 
         total_loss += loss.item()
         pbar.set_postfix({"loss": total_loss / (pbar.n + 1)})
@@ -1,5 +1,7 @@
 # train_grammar_transformer.py
 import json
+import mmap
+from array import array
 from tqdm import tqdm
 import torch
 from torch.utils.data import Dataset, DataLoader
@@ -8,29 +10,50 @@ import torch.nn.functional as F
 from hieroglyph_tokenizer import HieroglyphTokenizer
 from tokenizers import Tokenizer
 
+from fast_json import loads as _json_loads
+
 # ----------------------------
 # Dataset
 # ----------------------------
 class Seq2SeqDataset(Dataset):
+    """
+    Reads samples lazily: __init__ only records the byte offset of every line,
+    and __getitem__ parses its line from a read-only mmap of the file.
+    The mmap is opened per process, so DataLoader workers share the page cache.
+    """
     def __init__(self, jsonl_path, src_tokenizer, tgt_tokenizer, max_src_len=50, max_tgt_len=128):
-        self.samples = []
+        self.jsonl_path = jsonl_path
         self.src_tokenizer = src_tokenizer
         self.tgt_tokenizer = tgt_tokenizer
         self.max_src_len = max_src_len
         self.max_tgt_len = max_tgt_len
 
-        with open(jsonl_path, "r", encoding="utf-8") as f:
+        # Start offset of every line, plus the end of file as the final entry
+        self._offsets = array("q", [0])
+        with open(jsonl_path, "rb") as f:
             for line in f:
-                data = json.loads(line)
-                self.samples.append(data)
+                self._offsets.append(self._offsets[-1] + len(line))
+        self._mm = None
+
+    def __getstate__(self):
+        # mmap objects can't be pickled (spawned DataLoader workers); reopen lazily
+        state = self.__dict__.copy()
+        state["_mm"] = None
+        return state
+
+    def _sample(self, idx):
+        if self._mm is None:
+            with open(self.jsonl_path, "rb") as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return _json_loads(self._mm[self._offsets[idx]:self._offsets[idx + 1]])
 
     def __len__(self):
-        return len(self.samples)
+        return len(self._offsets) - 1
 
     def __getitem__(self, idx):
-        sample = self.samples[idx]
+        sample = self._sample(idx)
         src_tokens = self.src_tokenizer.tokenize_transliteration(sample["input_text"])
-        src_ids = [self.src_tokenizer.vocab.get(t['token'], 0) for t in src_tokens]
+        src_ids = [self.src_tokenizer.vocab.get(t.token, 0) for t in src_tokens]
         src_ids = src_ids[:self.max_src_len]
 
         tgt_enc = self.tgt_tokenizer.encode(sample["output_text"])
@@ -41,22 +64,21 @@ class Seq2SeqDataset(Dataset):
 # ----------------------------
 # Collate function
 # ----------------------------
+def _pad_batch(seqs, padding_value=0):
+    """
+    Right-pad 1-D long tensors into a [batch, max_len] tensor with a single
+    masked scatter of their concatenation (no per-sample Python copies).
+    """
+    lengths = torch.tensor([len(s) for s in seqs])
+    max_len = int(lengths.max())
+    padded = torch.full((len(seqs), max_len), padding_value, dtype=torch.long)
+    mask = torch.arange(max_len).unsqueeze(0) < lengths.unsqueeze(1)
+    padded[mask] = torch.cat(seqs)
+    return padded
+
 def collate_fn(batch):
     src_batch, tgt_batch = zip(*batch)
-    src_lens = [len(s) for s in src_batch]
-    tgt_lens = [len(t) for t in tgt_batch]
-
-    max_src_len = max(src_lens)
-    max_tgt_len = max(tgt_lens)
-
-    src_padded = torch.zeros(len(batch), max_src_len, dtype=torch.long)
-    tgt_padded = torch.zeros(len(batch), max_tgt_len, dtype=torch.long)
-
-    for i, (s, t) in enumerate(zip(src_batch, tgt_batch)):
-        src_padded[i, :len(s)] = s
-        tgt_padded[i, :len(t)] = t
-
-    return src_padded, tgt_padded
+    return _pad_batch(src_batch), _pad_batch(tgt_batch)
 
 # ----------------------------
 # Grammar-aware Transformer
@@ -93,7 +115,8 @@ class GrammarAwareTransformer(nn.Module):
             num_encoder_layers=num_layers,
             num_decoder_layers=num_layers,
             dim_feedforward=dim_feedforward,
-            dropout=dropout
+            dropout=dropout,
+            batch_first=True  # the collate functions emit [batch, seq]
         )
 
         # Final projection
@@ -104,24 +127,25 @@ class GrammarAwareTransformer(nn.Module):
 
     def forward(self, src_tokens, src_pos, tgt_tokens):
         """
-        src_tokens: [seq_len_src, batch]
-        src_pos:    [seq_len_src, batch] (POS indices)
-        tgt_tokens: [seq_len_tgt, batch]
+        src_tokens: [batch, seq_len_src]
+        src_pos:    [batch, seq_len_src] (POS indices)
+        tgt_tokens: [batch, seq_len_tgt]
         """
 
-        seq_len_src, batch_size = src_tokens.size()
-        seq_len_tgt = tgt_tokens.size(0)
+        seq_len_src = src_tokens.size(1)
+        seq_len_tgt = tgt_tokens.size(1)
 
         # Encoder embeddings: token + POS + positional
+        # Positional embeddings are [1, seq_len, d_model] and broadcast over the batch
         src_token_emb = self.token_embedding(src_tokens)
         src_pos_emb = self.pos_embedding(src_pos)
-        positions_src = torch.arange(seq_len_src, device=src_tokens.device).unsqueeze(1).expand(seq_len_src, batch_size)
+        positions_src = torch.arange(seq_len_src, device=src_tokens.device).unsqueeze(0)
         src_positional_emb = self.positional_embedding(positions_src)
         src_emb = src_token_emb + src_pos_emb + src_positional_emb
 
         # Decoder embeddings
         tgt_emb = self.token_embedding(tgt_tokens)
-        positions_tgt = torch.arange(seq_len_tgt, device=tgt_tokens.device).unsqueeze(1).expand(seq_len_tgt, batch_size)
+        positions_tgt = torch.arange(seq_len_tgt, device=tgt_tokens.device).unsqueeze(0)
         tgt_positional_emb = self.positional_embedding(positions_tgt)
         tgt_emb = tgt_emb + tgt_positional_emb  # decoder doesn’t use POS embeddings
 
@@ -133,7 +157,7 @@ class GrammarAwareTransformer(nn.Module):
         output = self.transformer.decoder(tgt_emb, memory, tgt_mask=tgt_mask)
 
         # Project to vocab
-        logits = self.fc_out(output)  # [seq_len_tgt, batch, vocab_size]
+        logits = self.fc_out(output)  # [batch, seq_len_tgt, vocab_size]
 
         return logits
 
@@ -142,7 +166,12 @@ class GrammarAwareTransformer(nn.Module):
 # ----------------------------
 def train(model, dataloader, epochs=10, lr=1e-4, device='cuda'):
     model.to(device)
-    optimizer = torch.optim.Adam(model.parameters(), lr=lr)
+    device_type = torch.device(device).type
+    use_amp = device_type == "cuda"
+    # Mixed precision on GPU: bf16 where supported (no loss scaling needed), else fp16 + GradScaler
+    amp_dtype = torch.bfloat16 if use_amp and torch.cuda.is_bf16_supported() else torch.float16
+    scaler = torch.amp.GradScaler('cuda', enabled=use_amp and amp_dtype == torch.float16)
+    optimizer = torch.optim.Adam(model.parameters(), lr=lr, fused=use_amp)
     criterion = nn.CrossEntropyLoss(ignore_index=0)
 
     for epoch in range(epochs):
@@ -155,11 +184,13 @@ def train(model, dataloader, epochs=10, lr=1e-4, device='cuda'):
             tgt_output = tgt[:, 1:]
 
             optimizer.zero_grad()
-            logits = model(src, tgt_input)
+            with torch.autocast(device_type=device_type, dtype=amp_dtype, enabled=use_amp):
+                logits = model(src, tgt_input)
+                loss = criterion(logits.reshape(-1, logits.size(-1)), tgt_output.reshape(-1))
 
-            loss = criterion(logits.reshape(-1, logits.size(-1)), tgt_output.reshape(-1))
-            loss.backward()
-            optimizer.step()
+            scaler.scale(loss).backward()
+            scaler.step(optimizer)
+            scaler.update()
 
             total_loss += loss.item()
             pbar.set_postfix({'loss': total_loss / (pbar.n + 1)})
@@ -177,7 +208,7 @@ if __name__ == "__main__":
             data = json.loads(line)
             toks = src_tokenizer.tokenize_transliteration(data["input_text"])
             for t in toks:
-                tokens.add(t['token'])
+                tokens.add(t.token)
     src_tokenizer.vocab = {tok: i+1 for i, tok in enumerate(sorted(tokens))}
     src_tokenizer.vocab["<UNK>"] = 0
 
@@ -185,7 +216,8 @@ if __name__ == "__main__":
     tgt_tokenizer = Tokenizer.from_file("german-bpe.json")
 
     dataset = Seq2SeqDataset("dataset_word_subword_hg2de.jsonl", src_tokenizer, tgt_tokenizer)
-    dataloader = DataLoader(dataset, batch_size=8, shuffle=True, collate_fn=collate_fn)
+    dataloader = DataLoader(dataset, batch_size=8, shuffle=True, collate_fn=collate_fn,
+                            pin_memory=torch.cuda.is_available())
 
     model = GrammarAwareTransformer(
         src_vocab_size=len(src_tokenizer.vocab),
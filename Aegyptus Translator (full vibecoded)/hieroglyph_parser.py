@@ -3,26 +3,60 @@ import json
 import re
 from typing import List, Dict
 
+# Morphological classes of a transliteration
+_PREFIX_FULL = re.compile(r"\([a-zA-Z]+\)")
+_SUFFIX_FULL = re.compile(r"(\.|=)[a-zA-Z]+")
+_DETERMINATIVE = frozenset(("", "-"))
+
+# Trie key marking "a lexicon sign ends here"; never a single character
+_LEAF = ""
+
 class HieroglyphParser:
     def __init__(self, lexicon_path: str):
         with open(lexicon_path, "r", encoding="utf-8") as f:
             self.lexicon = json.load(f)
         self.sorted_signs = sorted(self.lexicon.keys(), key=len, reverse=True)
+        self._trie = self._build_trie(self.lexicon)
+
+    @staticmethod
+    def _build_trie(lexicon: Dict) -> Dict:
+        """Character trie over the lexicon signs, used for longest-match lookup."""
+        trie = {}
+        for sign in lexicon:
+            if not sign:
+                continue
+            node = trie
+            for ch in sign:
+                node = node.setdefault(ch, {})
+            node[_LEAF] = sign
+        return trie
+
+    def _longest_match(self, text: str, start: int):
+        """Return the longest lexicon sign starting at text[start], or None."""
+        node = self._trie
+        match = None
+        for i in range(start, len(text)):
+            node = node.get(text[i])
+            if node is None:
+                break
+            if _LEAF in node:
+                match = node[_LEAF]
+        return match
 
     # -------------------------
     # Morphological helpers
     # -------------------------
     @staticmethod
     def is_prefix(translit: str) -> bool:
-        return bool(re.fullmatch(r"\([a-zA-Z]+\)", translit))
+        return bool(_PREFIX_FULL.fullmatch(translit))
 
     @staticmethod
     def is_suffix(translit: str) -> bool:
-        return bool(re.fullmatch(r"(\.|=)[a-zA-Z]+", translit))
+        return bool(_SUFFIX_FULL.fullmatch(translit))
 
     @staticmethod
     def is_determinative(translit: str) -> bool:
-        return translit in ["", "-"]
+        return translit in _DETERMINATIVE
 
     @staticmethod
     def add_morph_marker(translit: str) -> str:
@@ -40,36 +74,37 @@ class HieroglyphParser:
     def parse_word(self, word: str) -> List[Dict]:
         tokens = []
         t = word.strip()
-        while t:
-            match = None
-            for sign in self.sorted_signs:
-                if t.startswith(sign):
-                    match = sign
-                    entry = self.lexicon[sign]
-                    translit = entry.get("transliterations", [""])[0]
-                    upos = entry.get("upos", ["unknown"])[0]
-                    lemma = entry.get("lemmas", [""])[0]
-                    gloss = entry.get("glosses", [""])[0]
-                    translit_marked = self.add_morph_marker(translit)
+        pos, end = 0, len(t)
+        while pos < end:
+            sign = self._longest_match(t, pos)
+            if sign is not None:
+                entry = self.lexicon[sign]
+                translit = entry.get("transliterations", [""])[0]
+                upos = entry.get("upos", ["unknown"])[0]
+                lemma = entry.get("lemmas", [""])[0]
+                gloss = entry.get("glosses", [""])[0]
+                translit_marked = self.add_morph_marker(translit)
 
-                    tokens.append({
-                        "glyph": sign,
-                        "gardiner": entry.get("gardiner", [[]])[0],
-                        "type": upos,
-                        "upos": upos,
-                        "lemma": lemma,
-                        "gloss": gloss,
-                        "translit": translit_marked,
-                        "prefix": self.is_prefix(translit),
-                        "suffix": self.is_suffix(translit),
-                        "determinative": self.is_determinative(translit)
-                    })
-                    t = t[len(sign):].strip()
-                    break
-            if not match:
                 tokens.append({
-                    "glyph": t[0],
-                    "gardiner": [f"UNK({t[0]})"],
+                    "glyph": sign,
+                    "gardiner": entry.get("gardiner", [[]])[0],
+                    "type": upos,
+                    "upos": upos,
+                    "lemma": lemma,
+                    "gloss": gloss,
+                    "translit": translit_marked,
+                    "prefix": self.is_prefix(translit),
+                    "suffix": self.is_suffix(translit),
+                    "determinative": self.is_determinative(translit)
+                })
+                pos += len(sign)
+                # Skip whitespace between matched signs
+                while pos < end and t[pos].isspace():
+                    pos += 1
+            else:
+                tokens.append({
+                    "glyph": t[pos],
+                    "gardiner": [f"UNK({t[pos]})"],
                     "type": "unknown",
                     "upos": "unknown",
                     "lemma": "",
@@ -79,7 +114,7 @@ class HieroglyphParser:
                     "suffix": False,
                     "determinative": False
                 })
-                t = t[1:]
+                pos += 1
         return tokens
 
     def parse_sentence(self, sentence: str) -> List[List[Dict]]:
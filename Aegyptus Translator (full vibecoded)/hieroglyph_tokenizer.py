@@ -1,7 +1,40 @@
 # hieroglyph_tokenizer_combined_with_pos.py
 import json
-import re
-from typing import List, Dict, Any
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Dict, Any, Optional
+
+
+class _GlyphTranslitTable(dict):
+    """str.translate table (code point -> translit); "?" marks an unknown glyph."""
+    __slots__ = ()
+
+    def __missing__(self, codepoint: int) -> str:
+        return "?"
+
+
+@dataclass(frozen=True, slots=True)
+class Token:
+    """One tokenizer output token. Immutable, since tokens are shared through the word caches."""
+    token: str
+    type: str
+    lemma: Optional[str]
+    upos: Optional[str]
+    upos_id: int
+    gloss: Optional[str]
+    gardiner: Optional[Any]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "token": self.token,
+            "type": self.type,
+            "lemma": self.lemma,
+            "upos": self.upos,
+            "upos_id": self.upos_id,
+            "gloss": self.gloss,
+            "gardiner": self.gardiner
+        }
 
 class HieroglyphTokenizer:
     def __init__(self, lexicon_path: str):
@@ -11,80 +44,120 @@ class HieroglyphTokenizer:
         # ----------------------------
         # Build POS mappings
         # ----------------------------
-        pos_set = set()
-        for entry in self.lexicon.values():
-            upos = entry.get("upos")
-            if isinstance(upos, list):
-                pos_set.update(upos)
-            elif upos:
-                pos_set.add(upos)
+        upos_values = [entry.get("upos") for entry in self.lexicon.values()]
+        # upos is a plain string in lexicon_final.json; older lexicons store lists
+        pos_set = {u for u in upos_values if u and not isinstance(u, list)}
+        pos_set.update(*(u for u in upos_values if isinstance(u, list)))
 
-        # Mapping from POS tag to integer ID (0 reserved for padding/unknown)
+        # Mapping from POS tag to integer ID (0 reserved for padding/unknown).
+        # Sorted so the IDs are stable across runs: they index the trained POS embeddings.
         self.pos_to_id = {pos: i + 1 for i, pos in enumerate(sorted(pos_set))}
         self.id_to_pos = {i: pos for pos, i in self.pos_to_id.items()}
 
+        # ----------------------------
+        # Variant lookup indexes (first variant in lexicon order wins)
+        # ----------------------------
+        # glyph string -> (lemma_id, variant, upos, lemma translit)
+        self._glyph_to_variant = {}
+        # single-glyph code point -> its translit, for the per-glyph fallback
+        self._glyph_char_to_translit = _GlyphTranslitTable()
+        # variant translit -> (position in lexicon order, lemma_id, variant, upos)
+        self._translit_to_variant = {}
+        order = 0
+        for lemma_id, entry in self.lexicon.items():
+            upos = entry.get("upos")
+            lemma_translit = entry.get("lemma", "")
+            for var in entry.get("glyph_variants", []):
+                glyph = var.get("glyph")
+                glyph_str = glyph if isinstance(glyph, str) else "".join(glyph)
+                self._glyph_to_variant.setdefault(glyph_str, (lemma_id, var, upos, lemma_translit))
+                if isinstance(glyph, str) and len(glyph) == 1:
+                    self._glyph_char_to_translit.setdefault(ord(glyph), var.get("translit"))
+                translit = var.get("translit", "")
+                if isinstance(translit, str):
+                    self._translit_to_variant.setdefault(translit, (order, lemma_id, var, upos))
+                order += 1
+
+        # (token_type, upos) -> type tag, filled lazily by _build_token
+        self._tag_cache = {}
+
+        # Per-word token caches (the corpus repeats words heavily); values are tuples
+        self._glyph_word_cache = {}
+        self._translit_word_cache = {}
+
     # ----------------------------
     # Subword splitting helpers
     # ----------------------------
-    def _tokenize_subwords(self, word_translit: str, lemma_translit: str):
+    @staticmethod
+    @lru_cache(maxsize=100_000)
+    def _tokenize_subwords(word_translit: str, lemma_translit: str):
+        """Split a transliteration into (prefixes, root, suffixes); cached, so returns tuples."""
         prefixes, suffixes = [], []
-        temp = word_translit
+        start, end = 0, len(word_translit)
 
-        # Leading prefixes like (x)
-        while True:
-            m = re.match(r"^\([^\)]+\)", temp)
-            if not m: break
-            candidate = m.group(0)
-            if not lemma_translit.startswith(candidate):
-                prefixes.append(candidate)
-                temp = temp[len(candidate):]
-            else:
+        # Leading prefixes like (x), unless the lemma itself starts with them
+        while start < end and word_translit[start] == "(":
+            close = word_translit.find(")", start + 2)
+            if close == -1 or word_translit[start + 1] == ")":
                 break
+            candidate = word_translit[start:close + 1]
+            if lemma_translit.startswith(candidate):
+                break
+            prefixes.append(candidate)
+            start = close + 1
 
-        # Trailing suffixes like .x or =x
+        # Trailing suffixes like .x or =x, unless the lemma itself ends with them
         while True:
-            m = re.search(r"(\.|=)[^\s\.=]+$", temp)
-            if not m: break
-            candidate = m.group(0)
-            if not lemma_translit.endswith(candidate):
-                suffixes.insert(0, candidate)
-                temp = temp[:-len(candidate)]
-            else:
+            i = end
+            while i > start and word_translit[i - 1] not in ".=" and not word_translit[i - 1].isspace():
+                i -= 1
+            if i == end or i == start or word_translit[i - 1] not in ".=":
+                break
+            candidate = word_translit[i - 1:end]
+            if lemma_translit.endswith(candidate):
                 break
+            suffixes.append(candidate)
+            end = i - 1
 
-        root = temp
-        return prefixes, root, suffixes
+        suffixes.reverse()
+        root = word_translit[start:end]
+        return tuple(prefixes), root, tuple(suffixes)
 
     # ----------------------------
-    # Build token dict
+    # Build token
     # ----------------------------
-    def _build_token_dict(self, token_str: str, token_type: str,
-                          upos: Any, lemma: str, gloss: str, gardiner: Any) -> Dict[str, Any]:
+    def _build_token(self, token_str: str, token_type: str,
+                     upos: Any, lemma: str, gloss: str, gardiner: Any) -> Token:
         upos_str = upos[0] if isinstance(upos, list) and upos else upos
-        tag = token_type.upper()
-        if tag == "PREFIX":
-            tag = f"PRE {upos_str.upper()}" if upos_str else "PRE"
-        elif tag == "SUFFIX":
-            tag = f"SUF {upos_str.upper()}" if upos_str else "SUF"
-        elif tag == "ROOT":
-            tag = upos_str.upper() if upos_str else "ROOT"
-        elif tag == "UNKNOWN":
-            tag = "UNKNOWN"
+        key = (token_type, upos_str)
+        tag = self._tag_cache.get(key)
+        if tag is None:
+            tag = token_type.upper()
+            if tag == "PREFIX":
+                tag = f"PRE {upos_str.upper()}" if upos_str else "PRE"
+            elif tag == "SUFFIX":
+                tag = f"SUF {upos_str.upper()}" if upos_str else "SUF"
+            elif tag == "ROOT":
+                tag = upos_str.upper() if upos_str else "ROOT"
+            elif tag == "UNKNOWN":
+                tag = "UNKNOWN"
+            # Interned so every token of a given type shares one string object
+            tag = self._tag_cache[key] = sys.intern(tag)
 
-        return {
-            "token": token_str,
-            "type": tag,
-            "lemma": lemma,
-            "upos": upos_str,
-            "upos_id": self.pos_to_id.get(upos_str, 0) if upos_str else 0,
-            "gloss": gloss,
-            "gardiner": gardiner
-        }
+        return Token(
+            token=token_str,
+            type=tag,
+            lemma=lemma,
+            upos=upos_str,
+            upos_id=self.pos_to_id.get(upos_str, 0) if upos_str else 0,
+            gloss=gloss,
+            gardiner=gardiner
+        )
 
     # ----------------------------
     # Tokenize a single word variant
     # ----------------------------
-    def _tokenize_word_by_variant(self, variant: Dict[str, Any], lemma_translit: str, upos: Any) -> List[Dict[str, Any]]:
+    def _tokenize_word_by_variant(self, variant: Dict[str, Any], lemma_translit: str, upos: Any) -> List[Token]:
         word_translit = variant.get("translit", "")
         gloss = variant.get("gloss", None)
         gardiner = variant.get("gardiner", None)
@@ -92,96 +165,120 @@ class HieroglyphTokenizer:
 
         tokens = []
         for p in prefixes:
-            tokens.append(self._build_token_dict(p, "PREFIX", upos, lemma_translit, gloss, None))
-        tokens.append(self._build_token_dict(root, "ROOT", upos, lemma_translit, gloss, gardiner))
+            tokens.append(self._build_token(p, "PREFIX", upos, lemma_translit, gloss, None))
+        tokens.append(self._build_token(root, "ROOT", upos, lemma_translit, gloss, gardiner))
         for s in suffixes:
-            tokens.append(self._build_token_dict(s, "SUFFIX", upos, lemma_translit, gloss, None))
+            tokens.append(self._build_token(s, "SUFFIX", upos, lemma_translit, gloss, None))
         return tokens
 
     # ----------------------------
     # Per-glyph fallback for unknown words
     # ----------------------------
-    def _tokenize_per_glyph(self, glyph_word: str) -> List[Dict[str, Any]]:
-        translit_parts = []
-        for g in glyph_word:
-            found = False
-            for lemma_id, entry in self.lexicon.items():
-                for var in entry.get("glyph_variants", []):
-                    if g == var.get("glyph"):
-                        translit_parts.append(var.get("translit"))
-                        found = True
-                        break
-                if found: break
-            if not found:
-                translit_parts.append("?")  # unknown glyph fallback
-        return [{
-            "token": "".join(translit_parts),
-            "type": "UNKNOWN",
-            "lemma": None,
-            "upos": None,
-            "upos_id": 0,
-            "gloss": None,
-            "gardiner": None
-        }]
+    def _tokenize_per_glyph(self, glyph_word: str) -> List[Token]:
+        return [Token(
+            token=glyph_word.translate(self._glyph_char_to_translit),
+            type="UNKNOWN",
+            lemma=None,
+            upos=None,
+            upos_id=0,
+            gloss=None,
+            gardiner=None
+        )]
 
     # ----------------------------
     # Tokenize hieroglyphic word
     # ----------------------------
-    def _tokenize_word_from_glyph(self, glyph_word: str) -> List[Dict[str, Any]]:
+    def _tokenize_word_from_glyph(self, glyph_word: str) -> List[Token]:
         glyph_word = glyph_word.strip()
-        for lemma_id, entry in self.lexicon.items():
-            for var in entry.get("glyph_variants", []):
-                glyph_str = var.get("glyph") if isinstance(var.get("glyph"), str) else "".join(var.get("glyph"))
-                if glyph_word == glyph_str:
-                    return self._tokenize_word_by_variant(var, entry.get("lemma", ""), entry.get("upos"))
-
-        # fallback
-        return self._tokenize_per_glyph(glyph_word)
+        cached = self._glyph_word_cache.get(glyph_word)
+        if cached is None:
+            hit = self._glyph_to_variant.get(glyph_word)
+            if hit is not None:
+                _, var, upos, lemma_translit = hit
+                tokens = self._tokenize_word_by_variant(var, lemma_translit, upos)
+            else:
+                # fallback
+                tokens = self._tokenize_per_glyph(glyph_word)
+            cached = self._glyph_word_cache[glyph_word] = tuple(tokens)
+        return list(cached)
 
     # ----------------------------
     # Hieroglyphic sentence tokenization
     # ----------------------------
-    def tokenize_hieroglyphs(self, sentence: str) -> List[Dict[str, Any]]:
+    def tokenize_hieroglyphs(self, sentence: str) -> List[Token]:
         all_tokens = []
-        for w in sentence.strip().split():
-            all_tokens.extend(self._tokenize_word_from_glyph(w))
+        extend = all_tokens.extend
+        tokenize_word = self._tokenize_word_from_glyph
+        for w in sentence.split():
+            extend(tokenize_word(w))
         return all_tokens
 
+    # ----------------------------
+    # Transliteration variant lookup
+    # ----------------------------
+    def _match_translit(self, word: str):
+        """
+        The earliest variant (in lexicon order) whose translit equals the word
+        or is a prefix or suffix of it.
+        Probes every prefix/suffix slice of the word against the translit index,
+        so the cost depends on the word length, not the lexicon size.
+        """
+        index = self._translit_to_variant
+        best = index.get("")
+        hit = index.get(word)
+        if hit is not None and (best is None or hit[0] < best[0]):
+            best = hit
+        for i in range(1, len(word)):
+            for cand in (index.get(word[:i]), index.get(word[i:])):
+                if cand is not None and (best is None or cand[0] < best[0]):
+                    best = cand
+        return best
+
     # ----------------------------
     # Transliteration sentence tokenization
     # ----------------------------
-    def tokenize_transliteration(self, sentence: str) -> List[Dict[str, Any]]:
+    def _tokenize_translit_word(self, word: str) -> List[Token]:
+        cached = self._translit_word_cache.get(word)
+        if cached is not None:
+            return list(cached)
+
+        tokens = []
+        lemma_id, variant, entry_upos = None, None, None
+        hit = self._match_translit(word)
+        if hit is not None:
+            _, lemma_id, variant, entry_upos = hit
+
+        if lemma_id:
+            lemma_translit = self.lexicon[lemma_id]["lemma"]
+            upos = entry_upos
+            gloss = variant.get("gloss") if variant else None
+            gardiner = variant.get("gardiner") if variant else None
+            prefixes, root, suffixes = self._tokenize_subwords(word, lemma_translit)
+            for p in prefixes:
+                tokens.append(self._build_token(p, "PREFIX", upos, lemma_translit, gloss, None))
+            tokens.append(self._build_token(root, "ROOT", upos, lemma_translit, gloss, gardiner))
+            for s in suffixes:
+                tokens.append(self._build_token(s, "SUFFIX", upos, lemma_translit, gloss, None))
+        else:
+            # unknown word
+            tokens.append(self._build_token(word, "UNKNOWN", None, None, None, None))
+
+        self._translit_word_cache[word] = tuple(tokens)
+        return tokens
+
+    def tokenize_transliteration(self, sentence: str) -> List[Token]:
         all_tokens = []
-        for word in sentence.strip().split():
-            lemma_id, variant, entry_upos = None, None, None
-            for k, v in self.lexicon.items():
-                for var in v.get("glyph_variants", []):
-                    if word == var.get("translit") or word.startswith(var.get("translit", "")) or word.endswith(var.get("translit", "")):
-                        lemma_id, variant, entry_upos = k, var, v.get("upos")
-                        break
-                if lemma_id: break
-
-            if lemma_id:
-                lemma_translit = self.lexicon[lemma_id]["lemma"]
-                upos = entry_upos
-                gloss = variant.get("gloss") if variant else None
-                gardiner = variant.get("gardiner") if variant else None
-                prefixes, root, suffixes = self._tokenize_subwords(word, lemma_translit)
-                for p in prefixes:
-                    all_tokens.append(self._build_token_dict(p, "PREFIX", upos, lemma_translit, gloss, None))
-                all_tokens.append(self._build_token_dict(root, "ROOT", upos, lemma_translit, gloss, gardiner))
-                for s in suffixes:
-                    all_tokens.append(self._build_token_dict(s, "SUFFIX", upos, lemma_translit, gloss, None))
-            else:
-                # unknown word
-                all_tokens.append(self._build_token_dict(word, "UNKNOWN", None, None, None, None))
+        extend = all_tokens.extend
+        tokenize_word = self._tokenize_translit_word
+        for word in sentence.split():
+            extend(tokenize_word(word))
         return all_tokens
 
     # ----------------------------
     # Convert tokens to model-ready string
     # ----------------------------
-    def tokens_to_string(self, tokens: List[Dict[str, Any]]) -> str:
-        return " ".join(f"[{t['type']}]{t['token']}" for t in tokens)
+    def tokens_to_string(self, tokens: List[Token]) -> str:
+        return " ".join(f"[{t.type}]{t.token}" for t in tokens)
 
 
 # ----------------------------
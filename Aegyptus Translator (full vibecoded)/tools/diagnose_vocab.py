@@ -1,8 +1,11 @@
 from pathlib import Path
-import json
 import sys
+from itertools import islice
 from transformers import PreTrainedTokenizerFast, AutoModelForSeq2SeqLM
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from fast_json import loads as _json_loads
+
 print('Working dir:', Path('.').resolve())
 
 tokenizer_dir = Path('./tokenizer')
@@ -61,11 +64,11 @@ if not corpus_file.exists():
     sys.exit(1)
 
 bad_ids_found = False
-with open(corpus_file, 'r', encoding='utf-8') as f:
-    for i, line in enumerate(f):
-        if i >= 10:
-            break
-        entry = json.loads(line)
+# (max_src, max_tgt, len_src, len_tgt) per entry, reused for the post-resize check
+diagnostics = []
+with open(corpus_file, 'rb') as f:
+    for i, line in enumerate(islice(f, 10)):
+        entry = _json_loads(line)
         source_text = (
             f"[HIERO] {entry.get('hieroglyphs','')}\n"
             f"[TRANS] {entry.get('transliteration','')}\n"
@@ -73,11 +76,12 @@ with open(corpus_file, 'r', encoding='utf-8') as f:
             f"[GLOSS] {entry.get('glossing','')}"
         )
         target_text = entry.get('translation','') or ''
-        toks_src = tokenizer(source_text, truncation=True, padding=False)
-        toks_tgt = tokenizer(target_text, truncation=True, padding=False)
-        max_src = max(toks_src['input_ids']) if toks_src['input_ids'] else -1
-        max_tgt = max(toks_tgt['input_ids']) if toks_tgt['input_ids'] else -1
-        print(f'Entry {i}: max_src_id={max_src}, max_tgt_id={max_tgt}, len_src={len(toks_src["input_ids"])}, len_tgt={len(toks_tgt["input_ids"]) }')
+        src_ids = tokenizer(source_text, truncation=True, padding=False, return_tensors='np')['input_ids']
+        tgt_ids = tokenizer(target_text, truncation=True, padding=False, return_tensors='np')['input_ids']
+        max_src = int(src_ids.max()) if src_ids.size else -1
+        max_tgt = int(tgt_ids.max()) if tgt_ids.size else -1
+        diagnostics.append((max_src, max_tgt, src_ids.size, tgt_ids.size))
+        print(f'Entry {i}: max_src_id={max_src}, max_tgt_id={max_tgt}, len_src={src_ids.size}, len_tgt={tgt_ids.size}')
         # check against embed_size_before
         if embed_size_before is not None and (max_src >= embed_size_before or max_tgt >= embed_size_before):
             print('  -> WARNING: token id >= model embedding size before resize')
@@ -94,25 +98,10 @@ print('model input embeddings vocab size (after resize):', embed_size_after)
 
 # Re-check token ids against new embedding size
 if embed_size_after is not None:
-    with open(corpus_file, 'r', encoding='utf-8') as f:
-        for i, line in enumerate(f):
-            if i >= 10:
-                break
-            entry = json.loads(line)
-            source_text = (
-                f"[HIERO] {entry.get('hieroglyphs','')}\n"
-                f"[TRANS] {entry.get('transliteration','')}\n"
-                f"[LEMMA] {entry.get('lemmatization','')}\n"
-                f"[GLOSS] {entry.get('glossing','')}"
-            )
-            target_text = entry.get('translation','') or ''
-            toks_src = tokenizer(source_text, truncation=True, padding=False)
-            toks_tgt = tokenizer(target_text, truncation=True, padding=False)
-            max_src = max(toks_src['input_ids']) if toks_src['input_ids'] else -1
-            max_tgt = max(toks_tgt['input_ids']) if toks_tgt['input_ids'] else -1
-            if max_src >= embed_size_after or max_tgt >= embed_size_after:
-                print(f'Entry {i} STILL has token id >= embedding size after resize: max_src={max_src}, max_tgt={max_tgt}')
-                bad_ids_found = True
+    for i, (max_src, max_tgt, _, _) in enumerate(diagnostics):
+        if max_src >= embed_size_after or max_tgt >= embed_size_after:
+            print(f'Entry {i} STILL has token id >= embedding size after resize: max_src={max_src}, max_tgt={max_tgt}')
+            bad_ids_found = True
 
 print('\nSummary: bad_ids_found=', bad_ids_found)
 if bad_ids_found:
@@ -1,6 +1,6 @@
-import json
 from pathlib import Path
-from datasets import Dataset
+import numpy as np
+from datasets import load_dataset
 from transformers import (
     PreTrainedTokenizerFast,
     AutoModelForSeq2SeqLM,
@@ -19,38 +19,41 @@ print('Loading tokenizer from', tokenizer_dir)
 tokenizer = PreTrainedTokenizerFast.from_pretrained(tokenizer_dir)
 print('Tokenizer len', len(tokenizer))
 
-# load entries
-entries = []
-with open(corpus_file, 'r', encoding='utf-8') as f:
-    for line in f:
-        entries.append(json.loads(line))
-print('Total entries', len(entries))
+# load entries straight into an Arrow-backed dataset (no intermediate list of dicts)
+corpus = load_dataset('json', data_files=str(corpus_file), split='train')
+print('Total entries', len(corpus))
 
-# simple split
-train_entries = entries[:int(len(entries)*0.9)]
-val_entries = entries[int(len(entries)*0.9):]
+# simple split: first 90% train, rest validation (same contiguous split as before, no shuffling)
+n_train = int(len(corpus)*0.9)
+train_corpus = corpus.select(range(n_train))
+val_corpus = corpus.select(range(n_train, len(corpus)))
 
 source_max_length = 256
 target_max_length = 128
 
-def preprocess(entry):
-    source_text = (
-        f"[HIERO] {entry.get('hieroglyphs','')}\n"
-        f"[TRANS] {entry.get('transliteration','')}\n"
-        f"[LEMMA] {entry.get('lemmatization','')}\n"
-        f"[GLOSS] {entry.get('glossing','')}"
-    )
-    target_text = entry.get('translation', '')
-    model_inputs = tokenizer(source_text, max_length=source_max_length, truncation=True, padding='max_length')
-    labels = tokenizer(target_text, max_length=target_max_length, truncation=True, padding='max_length')
+def preprocess_batch(batch):
+    # One tokenizer call per column of a whole batch instead of one per row
+    sources = [
+        f"[HIERO] {hiero}\n"
+        f"[TRANS] {trans}\n"
+        f"[LEMMA] {lemma}\n"
+        f"[GLOSS] {gloss}"
+        for hiero, trans, lemma, gloss in zip(
+            batch['hieroglyphs'], batch['transliteration'], batch['lemmatization'], batch['glossing']
+        )
+    ]
+    targets = batch['translation']
+    model_inputs = tokenizer(sources, max_length=source_max_length, truncation=True, padding='max_length')
+    labels = tokenizer(targets, max_length=target_max_length, truncation=True, padding='max_length')
     # mask label padding ids with -100 so loss ignores them
     pad_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else 0
-    label_ids = [ (tid if tid != pad_id else -100) for tid in labels['input_ids'] ]
-    model_inputs['labels'] = label_ids
+    label_ids = np.asarray(labels['input_ids'])
+    label_ids[label_ids == pad_id] = -100
+    model_inputs['labels'] = label_ids.tolist()
     return model_inputs
 
-train_dataset = Dataset.from_list(train_entries).map(preprocess)
-val_dataset = Dataset.from_list(val_entries).map(preprocess)
+train_dataset = train_corpus.map(preprocess_batch, batched=True, batch_size=1000)
+val_dataset = val_corpus.map(preprocess_batch, batched=True, batch_size=1000)
 print('Train/Val sizes', len(train_dataset), len(val_dataset))
 
 print('Loading model...')
@@ -81,37 +84,31 @@ except Exception:
 print('encoder embed vocab size:', enc_emb, 'decoder embed vocab size:', dec_emb)
 
 # quick static scan: find max token id in datasets
+def max_ids_per_example(ds):
+    """Per-example max of input_ids and labels, computed on NumPy columns (rows are padded to a fixed length)."""
+    if len(ds) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    cols = ds.with_format('numpy')
+    ids = np.asarray(cols['input_ids'])
+    lbls = np.asarray(cols['labels'])
+    return ids.max(axis=1, initial=-1), lbls.max(axis=1, initial=-1)
+
+def first_bad_examples(ids_max, lbls_max, limit, emb_size):
+    mask = (ids_max >= emb_size) | (lbls_max >= emb_size)
+    return [(int(i), int(ids_max[i]), int(lbls_max[i])) for i in np.nonzero(mask)[0][:limit]]
+
 print('\nScanning token ids in train/val for max id (tokenizer only, no model)')
-max_id_train = -1
-max_id_val = -1
-for i, ex in enumerate(train_dataset):
-    try:
-        m = max(ex['input_ids']) if ex['input_ids'] else -1
-        ml = max(ex['labels']) if ex['labels'] else -1
-        max_id_train = max(max_id_train, m, ml)
-    except Exception:
-        pass
-for i, ex in enumerate(val_dataset):
-    try:
-        m = max(ex['input_ids']) if ex['input_ids'] else -1
-        ml = max(ex['labels']) if ex['labels'] else -1
-        max_id_val = max(max_id_val, m, ml)
-    except Exception:
-        pass
+train_ids_max, train_lbls_max = max_ids_per_example(train_dataset)
+val_ids_max, val_lbls_max = max_ids_per_example(val_dataset)
+max_id_train = int(max(train_ids_max.max(initial=-1), train_lbls_max.max(initial=-1)))
+max_id_val = int(max(val_ids_max.max(initial=-1), val_lbls_max.max(initial=-1)))
 print('max token id in train examples:', max_id_train)
 print('max token id in val examples:  ', max_id_val)
 
 if emb_after is not None:
     if max_id_train >= emb_after or max_id_val >= emb_after:
         print('\nWARNING: Some token ids are >= model embedding size after resize. Listing first problematic examples...')
-        bad = []
-        for i, ex in enumerate(train_dataset):
-            max_id = max(ex['input_ids']) if ex['input_ids'] else -1
-            max_lbl = max(ex['labels']) if ex['labels'] else -1
-            if max_id >= emb_after or max_lbl >= emb_after:
-                bad.append((i, max_id, max_lbl))
-                if len(bad) >= 20:
-                    break
+        bad = first_bad_examples(train_ids_max, train_lbls_max, 20, emb_after)
         print('Found', len(bad), 'problematic train examples (showing up to 20):')
         for b in bad:
             print(b)
@@ -146,14 +143,7 @@ except Exception as e:
     # additional diagnostics: scan all token ids in train dataset for ids >= embedding size
     emb_size = model.get_input_embeddings().weight.shape[0]
     print('\nScanning train dataset for token ids >= embedding size', emb_size)
-    bad = []
-    for i, ex in enumerate(train_dataset):
-        max_id = max(ex['input_ids']) if ex['input_ids'] else -1
-        max_lbl = max(ex['labels']) if ex['labels'] else -1
-        if max_id >= emb_size or max_lbl >= emb_size:
-            bad.append((i, max_id, max_lbl))
-            if len(bad) >= 20:
-                break
+    bad = first_bad_examples(train_ids_max, train_lbls_max, 20, emb_size)
     print('Found', len(bad), 'problematic examples (showing up to 20):')
     for b in bad:
         print(b)
@@ -1,9 +1,13 @@
-import json
+import sys
+from itertools import islice
 from pathlib import Path
 from datasets import Dataset
 from transformers import PreTrainedTokenizerFast, AutoModelForSeq2SeqLM, DataCollatorForSeq2Seq, Seq2SeqTrainer, Seq2SeqTrainingArguments
 import torch
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from fast_json import loads as _json_loads
+
 print('Working dir:', Path('.').resolve())
 
 # paths
@@ -17,32 +21,31 @@ tokenizer = PreTrainedTokenizerFast.from_pretrained(tokenizer_dir)
 print('Loaded tokenizer len:', len(tokenizer))
 
 # load and prepare small dataset
-entries = []
-with open(corpus_file, 'r', encoding='utf-8') as f:
-    for i, line in enumerate(f):
-        if i >= 8:
-            break
-        entries.append(json.loads(line))
+with open(corpus_file, 'rb') as f:
+    entries = [_json_loads(line) for line in islice(f, 8)]
 
 print('Loaded', len(entries), 'entries')
 
 source_max_length = 256
 target_max_length = 128
 
-def preprocess(entry):
-    source_text = (
+def preprocess_batch(entries):
+    # Tokenize all sources and all targets in one call each, then split per example
+    sources = [
         f"[HIERO] {entry.get('hieroglyphs','')}\n"
         f"[TRANS] {entry.get('transliteration','')}\n"
         f"[LEMMA] {entry.get('lemmatization','')}\n"
         f"[GLOSS] {entry.get('glossing','')}"
-    )
-    target_text = entry.get('translation','') or ''
-    model_inputs = tokenizer(source_text, max_length=source_max_length, truncation=True, padding='max_length')
-    labels = tokenizer(target_text, max_length=target_max_length, truncation=True, padding='max_length')
+        for entry in entries
+    ]
+    targets = [entry.get('translation','') or '' for entry in entries]
+    model_inputs = tokenizer(sources, max_length=source_max_length, truncation=True, padding='max_length')
+    labels = tokenizer(targets, max_length=target_max_length, truncation=True, padding='max_length')
     model_inputs['labels'] = labels['input_ids']
-    return model_inputs
+    keys = list(model_inputs.keys())
+    return [{k: model_inputs[k][i] for k in keys} for i in range(len(entries))]
 
-mapped = [preprocess(e) for e in entries]
+mapped = preprocess_batch(entries)
 print('First mapped example input_ids max id:', max(mapped[0]['input_ids']))
 
 # load model but avoid full network download if possible; we'll only instantiate the config and embeddings
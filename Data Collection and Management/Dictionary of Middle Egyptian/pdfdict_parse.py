@@ -1,28 +1,86 @@
-import pdfplumber
 import re
 import json
 import logging
+import logging.handlers
 import os
+import queue
 import tempfile
+from multiprocessing import Pool
 
-# Set up logging
-logging.basicConfig(
-    filename="middle_egyptian_parse_errors.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+try:
+    import pymupdf  # optional: native text extraction, far faster than pdfplumber
+except ImportError:
+    pymupdf = None
+    import pdfplumber
+
+try:
+    import orjson  # optional: much faster JSON (de)serialization
+except ImportError:
+    orjson = None
+
+# Candidate entry start: a bracketed transliteration
+_BRACKET_RE = re.compile(r"\[[\w\s-]+\]")
+# Full entry: [translit] definition {gardiner}. The definition is a single
+# character class, so there is only one way to match it and no backtracking blowup.
+_ENTRY_RE = re.compile(r"\[([\w\s-]+)\]\s*([^\[\]{}]*)\s*\{([^}]*)\}")
+_WS_RE = re.compile(r"\s+")
+
+def _loads_json(data):
+    """Parse JSON from str or UTF-8 bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _dumps_json(obj):
+    """Serialize obj as indented UTF-8 JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+def _dumps_jsonl_line(obj):
+    """Serialize obj as one compact UTF-8 JSON line (newline included)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8") + b"\n"
+
+def _log_file_handler():
+    handler = logging.FileHandler("middle_egyptian_parse_errors.log")
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    return handler
+
+def _start_logging():
+    """
+    Route log records through a queue: the parser only enqueues them, and a
+    background listener thread does the file writes. Returns the started listener.
+    """
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))  # The file handler adds the rest
+    logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
+    listener = logging.handlers.QueueListener(log_queue, _log_file_handler())
+    listener.start()
+    return listener
+
+# Pages with fewer characters than this (blank pages, scanned plates) have no
+# usable text layer and are skipped without running layout analysis
+_MIN_PAGE_CHARS = 5
 
 def extract_column_text(page, verbose=False):
     """Extract text from both columns using crop."""
     page_height = page.height
-    # Estimate column threshold based on word positions
+    # page.chars is cheap and cached, so blank pages are caught before
+    # extract_words() runs layout analysis on them
+    if len(page.chars) < _MIN_PAGE_CHARS:
+        print(f"Warning: No text layer on page {page.page_number}, skipping")
+        return ""
+    
+    # Estimate column threshold based on word positions (same as the PyMuPDF path)
     words = page.extract_words()
     if not words:
         print(f"Warning: No words extracted from page, using default threshold")
         return page.extract_text() or ""
     
-    x_coords = [word['x0'] for word in words]
-    column_threshold = sum(x_coords) / len(x_coords) if x_coords else page.width / 2
+    column_threshold = sum(word['x0'] for word in words) / len(words)
     
     left_crop = (0, 0, column_threshold, page_height)
     right_crop = (column_threshold, 0, page.width, page_height)
@@ -35,95 +93,150 @@ def extract_column_text(page, verbose=False):
         print(f"Extracted column text (start): '{combined_text[:50]}...'")
     return combined_text
 
+def extract_column_text_pymupdf(page, verbose=False):
+    """Extract text from both columns using clip rectangles (PyMuPDF page)."""
+    # Estimate column threshold based on word positions
+    words = page.get_text("words")
+    if sum(len(w[4]) for w in words) < _MIN_PAGE_CHARS:
+        print(f"Warning: No text layer on page {page.number + 1}, skipping")
+        return ""
+    
+    column_threshold = sum(w[0] for w in words) / len(words)
+    rect = page.rect
+    
+    left_text = page.get_text("text", clip=pymupdf.Rect(0, 0, column_threshold, rect.height))
+    right_text = page.get_text("text", clip=pymupdf.Rect(column_threshold, 0, rect.width, rect.height))
+    
+    combined_text = left_text + "\n" + right_text  # Combine with newline
+    if verbose:
+        print(f"Extracted column text (start): '{combined_text[:50]}...'")
+    return combined_text
+
+def _open_pdf(pdf_path):
+    """Open the PDF with PyMuPDF when it is installed, otherwise pdfplumber."""
+    return pymupdf.open(pdf_path) if pymupdf is not None else pdfplumber.open(pdf_path)
+
+# Per-process PDF handle for page extraction (set by _init_worker)
+_worker_pdf = None
+_worker_verbose = False
+
+def _init_worker(pdf_path, verbose):
+    global _worker_pdf, _worker_verbose
+    _worker_pdf = _open_pdf(pdf_path)
+    _worker_verbose = verbose
+
+def _init_pool_worker(pdf_path, verbose):
+    """Pool initializer: set up logging for the worker process, then open the PDF."""
+    # The worker has no listener thread draining the main process's queue (and a
+    # spawned one has no logging setup at all), and it logs rarely, so it writes
+    # to the log file directly
+    root = logging.getLogger()
+    root.handlers = [_log_file_handler()]
+    root.setLevel(logging.INFO)
+    _init_worker(pdf_path, verbose)
+
+def _extract_page(page_num):
+    """
+    Extract the column text of one (1-based) page. Runs in worker processes.
+    A page that fails to extract is logged and skipped rather than ending the run.
+    """
+    try:
+        if pymupdf is not None:
+            return extract_column_text_pymupdf(_worker_pdf[page_num - 1], _worker_verbose)
+        page = _worker_pdf.pages[page_num - 1]
+        try:
+            return extract_column_text(page, _worker_verbose)
+        finally:
+            page.flush_cache()  # Parsed layout objects are not needed once the text is out
+    except Exception as e:
+        print(f"Error extracting page {page_num}, skipping: {e}")
+        logging.error(f"Error extracting page {page_num}, skipping: {e}")
+        return ""
+
 def parse_text(page_text, page_num, verbose=False):
     """Parse the accumulated page text and extract dictionary entries."""
     entries = []
-    pos = 0
-    last_pos = 0
-    max_iterations = 1000  # Safeguard against infinite loop
-    iteration = 0
+    # Per-entry messages are only built when someone will see them
+    log_info = logging.getLogger().isEnabledFor(logging.INFO)
     
-    while len(entries) < 100 and pos < len(page_text) and iteration < max_iterations:
-        # Look for potential entry start
-        potential_match = re.search(r"\[[\w\s-]+\]", page_text[pos:])
-        if not potential_match:
-            if verbose and pos > last_pos:
-                print(f"No potential entry found at pos {pos} on page {page_num}, text: '{page_text[pos:pos+50]}...'")
-            pos += 10  # Aggressive advancement on failure
-            iteration += 1
-            continue
-        
-        start_pos = pos + potential_match.start()
+    def report_unmatched(start, end):
+        """Report entry starts between two matches that never completed into an entry."""
+        for bracket in _BRACKET_RE.finditer(page_text, start, end):
+            bpos = bracket.start()
+            if verbose:
+                print(f"Unmatched entry on page {page_num} at pos {bpos}: '{page_text[bpos:bpos+50]}...'")
+            if log_info:
+                logging.info("Unmatched entry on page %s at pos %s: '%s...'", page_num, bpos, page_text[bpos:bpos+50])
+    
+    last_end = 0
+    for match in _ENTRY_RE.finditer(page_text):
+        pos = match.start()
+        if verbose or log_info:
+            report_unmatched(last_end, pos)
+        last_end = match.end()
         if verbose:
-            print(f"Attempting match at pos {start_pos} on page {page_num}: '{page_text[start_pos:start_pos+50]}...'")
-        
-        # Match full entry with flexible definition
-        match = re.search(r"\[(.*?)\]\s*((?:[^\[\]{}]+(?:\s+[^\[\]{}]+)*)?)\s*\{(.*?)\}", page_text[start_pos:], re.DOTALL)
-        if not match:
-            print(f"Unmatched entry on page {page_num} at pos {start_pos}: '{page_text[start_pos:start_pos+50]}...'")
-            logging.info(f"Unmatched entry on page {page_num} at pos {start_pos}: '{page_text[start_pos:start_pos+50]}...'")
-            pos = start_pos + 10  # Force advancement
-            iteration += 1
-            continue
-        
-        translit, definition, gardiner = match.groups()
-        pos += match.start() + 1
-        
+            print(f"Attempting match at pos {pos} on page {page_num}: '{page_text[pos:pos+50]}...'")
+
         # Validate and clean
-        translit = translit.strip()
-        definition = re.sub(r"\s+", " ", definition.strip())  # Normalize spaces
-        gardiner = gardiner.strip()
-        
+        translit = match.group(1).strip()
+        definition = _WS_RE.sub(" ", match.group(2).strip())  # Normalize spaces
+        gardiner = match.group(3).strip()
+
         if not translit or not gardiner:
-            print(f"Skipped entry on page {page_num} at pos {pos} due to invalid translit '{translit}' or gardiner '{gardiner}': '{page_text[pos-20:pos+20]}'")
-            logging.info(f"Skipped entry on page {page_num} at pos {pos} due to invalid translit '{translit}' or gardiner '{gardiner}': '{page_text[pos-20:pos+20]}'")
-            pos += 1
-            iteration += 1
-            continue
-        
-        if re.search(r"[\[\]{}]", definition):
-            print(f"Skipped entry on page {page_num} at pos {pos} due to invalid definition '{definition}': '{page_text[pos-20:pos+20]}'")
-            logging.info(f"Skipped entry on page {page_num} at pos {pos} due to invalid definition '{definition}': '{page_text[pos-20:pos+20]}'")
-            pos += 1
-            iteration += 1
+            if verbose:
+                print(f"Skipped entry on page {page_num} at pos {pos} due to invalid translit '{translit}' or gardiner '{gardiner}': '{page_text[pos-20:pos+20]}'")
+            if log_info:
+                logging.info("Skipped entry on page %s at pos %s due to invalid translit '%s' or gardiner '%s': '%s'",
+                             page_num, pos, translit, gardiner, page_text[pos-20:pos+20])
             continue
-        
+
         entry = {
             "transliteration": translit,
             "definition": definition,
             "gardiner": gardiner,
             "page": page_num
         }
-        print(f"Found entry on page {page_num} at pos {pos}: {entry}")
-        logging.info(f"Parsed entry on page {page_num}: {entry}")
+        if verbose:
+            print(f"Found entry on page {page_num} at pos {pos}: {entry}")
+        logging.info("Parsed entry on page %s: %s", page_num, entry)
         entries.append(entry)
-        pos += match.end()
-        last_pos = pos
-        iteration += 1
-    
-    if iteration >= max_iterations:
-        print(f"Warning: Max iterations reached on page {page_num} at pos {pos}, possible infinite loop")
-        logging.warning(f"Max iterations reached on page {page_num} at pos {pos}, possible infinite loop")
-    
+
+    if verbose or log_info:
+        report_unmatched(last_end, len(page_text))
     return entries
 
-def save_entries(entries, output_file):
-    """Load existing entries, append new ones, and save to JSON file."""
+def save_entries(entries, jsonl_file):
+    """Append new entries to the JSONL staging file (one entry per line)."""
+    print(f"Appending {len(entries)} entries to {jsonl_file}")
+    try:
+        with open(jsonl_file, 'ab') as f:
+            f.write(b"".join(_dumps_jsonl_line(e) for e in entries))
+        logging.info(f"Appended {len(entries)} entries to {jsonl_file}")
+    except Exception as e:
+        print(f"Error saving entries: {e}")
+        logging.error(f"Error saving entries to {jsonl_file}: {e}")
+
+def finalize_entries(jsonl_file, output_file):
+    """Merge the JSONL staging file into the JSON output file, then remove it."""
+    if not os.path.exists(jsonl_file):
+        return
     existing_entries = []
     if os.path.exists(output_file):
         try:
-            with open(output_file, 'r', encoding='utf-8') as f:
-                existing_entries = json.load(f)
+            with open(output_file, 'rb') as f:
+                existing_entries = _loads_json(f.read())
         except json.JSONDecodeError:
             print(f"Warning: {output_file} is corrupted, starting fresh")
             logging.warning(f"{output_file} is corrupted, starting fresh")
-    
-    all_entries = existing_entries + entries
+
+    with open(jsonl_file, 'rb') as f:
+        all_entries = existing_entries + [_loads_json(line) for line in f if line.strip()]
     print(f"Saving {len(all_entries)} total entries to {output_file}")
     try:
-        with tempfile.NamedTemporaryFile(mode="w", encoding="utf-8", delete=False, suffix=".json") as temp_file:
-            json.dump(all_entries, temp_file, ensure_ascii=False, indent=2)
+        with tempfile.NamedTemporaryFile(mode="wb", delete=False, suffix=".json", dir=os.path.dirname(os.path.abspath(output_file))) as temp_file:
+            temp_file.write(_dumps_json(all_entries))
         os.replace(temp_file.name, output_file)
+        os.remove(jsonl_file)
         print(f"Successfully saved entries to {output_file}")
         logging.info(f"Saved {len(all_entries)} entries to {output_file}")
     except Exception as e:
@@ -132,81 +245,102 @@ def save_entries(entries, output_file):
         if os.path.exists(temp_file.name):
             os.remove(temp_file.name)
 
-def parse_pdf(pdf_path, verbose=False):
-    """Parse the PDF page by page, accumulating text until a '}' is found."""
+def parse_pdf(pdf_path, verbose=False, processes=None, chunksize=4):
+    """
+    Parse the PDF page by page, accumulating text until a '}' is found.
+
+    Page text is extracted in a multiprocessing pool (processes=None uses every
+    core, processes=1 runs in-process), each worker opening the PDF once; pages
+    come back in order, so the accumulation below is unchanged.
+    """
     output_file = "middle_egyptian_entries.json"
+    jsonl_file = os.path.splitext(output_file)[0] + ".jsonl"
+    current_page = 5
+    # Page texts of the current block, joined once the block ends in '}'.
+    # Only the block as a whole is stripped, so pages abut directly.
+    accumulated = []
+    pool = None
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            total_pages = len(pdf.pages)
-            print(f"Processing {total_pages} pages starting from page 5...")
-            logging.info(f"Starting PDF processing with {total_pages} pages")
-
-            accumulated_text = ""
-            current_page = 5
-            while current_page <= total_pages:
-                print(f"Extracting text from page {current_page}...")
-                logging.info(f"Processing page {current_page}")
-                
-                # Extract text from both columns
-                page = pdf.pages[current_page - 1]  # 0-based index
-                page_text = extract_column_text(page, verbose)
-                accumulated_text += page_text + " "
-                accumulated_text = accumulated_text.strip().rstrip()  # Clean up whitespace
-                
-                # Debug: Print the last part of accumulated text
-                if verbose:
-                    print(f"Accumulated text: '{accumulated_text[-25] if accumulated_text else 'N/A'}'")
-                
-                # Check if the last character is '}'
-                if accumulated_text.strip() and accumulated_text[-1] == '}':
-                    print(f"Found end of accumulated text, parsing pages up to {current_page}...")
-                    page_entries = parse_text(accumulated_text, current_page, verbose)
-                    if page_entries:
-                        save_entries(page_entries, output_file)
-                    else:
-                        print(f"No valid entries found for pages up to {current_page}")
-                    accumulated_text = ""  # Reset for next block
-                else:
-                    print(f"No end of page {current_page} found, accumulating...")
-                
-                
-                current_page += 1
+        with _open_pdf(pdf_path) as pdf:
+            total_pages = len(pdf) if pymupdf is not None else len(pdf.pages)
+        print(f"Processing {total_pages} pages starting from page 5...")
+        logging.info(f"Starting PDF processing with {total_pages} pages")
+
+        pages = range(5, total_pages + 1)
+        if processes == 1:
+            _init_worker(pdf_path, verbose)
+            page_texts = map(_extract_page, pages)
+        else:
+            pool = Pool(processes, initializer=_init_pool_worker, initargs=(pdf_path, verbose))
+            page_texts = pool.imap(_extract_page, pages, chunksize=chunksize)
+
+        for current_page, page_text in zip(pages, page_texts):
+            print(f"Extracted text from page {current_page}...")
+            logging.info(f"Processing page {current_page}")
             
-            # Handle any remaining text
-            if accumulated_text:
-                print(f"Parsing remaining text from page {current_page - 1}...")
-                page_entries = parse_text(accumulated_text, current_page - 1, verbose)
+            page_text = page_text.rstrip() if accumulated else page_text.strip()
+            if page_text:
+                accumulated.append(page_text)
+            
+            # Debug: Print the last part of accumulated text
+            if verbose:
+                print(f"Accumulated text: '{accumulated[-1][-25:] if accumulated else 'N/A'}'")
+            
+            # Check if the last character is '}'
+            if accumulated and accumulated[-1][-1] == '}':
+                print(f"Found end of accumulated text, parsing pages up to {current_page}...")
+                page_entries = parse_text("".join(accumulated), current_page, verbose)
                 if page_entries:
-                    save_entries(page_entries, output_file)
+                    save_entries(page_entries, jsonl_file)
                 else:
-                    print(f"No valid entries found in remaining text up to page {current_page - 1}")
-            
-            print(f"Completed parsing all pages")
-            logging.info(f"Completed parsing")
-            return page_entries if 'page_entries' in locals() else []
+                    print(f"No valid entries found for pages up to {current_page}")
+                accumulated.clear()  # Reset for next block
+            else:
+                print(f"No end of page {current_page} found, accumulating...")
+        
+        # Handle any remaining text
+        if accumulated:
+            print(f"Parsing remaining text from page {current_page}...")
+            page_entries = parse_text("".join(accumulated), current_page, verbose)
+            if page_entries:
+                save_entries(page_entries, jsonl_file)
+            else:
+                print(f"No valid entries found in remaining text up to page {current_page}")
+        
+        print(f"Completed parsing all pages")
+        logging.info(f"Completed parsing")
+        return page_entries if 'page_entries' in locals() else []
     except Exception as e:
         print(f"Error processing PDF on page {current_page}: {e}")
-        print(f"Debug: text snippet = '{accumulated_text[:50]}...' if 'accumulated_text' in locals() else 'N/A'")
+        print(f"Debug: text snippet = '{accumulated[0][:50] if accumulated else 'N/A'}...'")
         logging.error(f"Error processing PDF on page {current_page}: {e}")
         return []
+    finally:
+        if pool is not None:
+            pool.terminate()
+        # Pages saved before any error still end up in the JSON output
+        finalize_entries(jsonl_file, output_file)
 
 def main():
     pdf_path = "DictionaryOfMiddleEgyptian.pdf"
-    
-    print(f"Checking for PDF file at {pdf_path}")
-    if not os.path.exists(pdf_path):
-        print(f"Error: PDF file not found at {pdf_path}")
-        logging.error(f"PDF file not found at {pdf_path}")
-        return
-    
-    print("Starting Middle Egyptian dictionary entry parsing...")
-    logging.info("Starting Middle Egyptian dictionary parsing...")
-    
-    entries = parse_pdf(pdf_path, verbose=True)
-    if entries:
-        print(f"Done! Entries saved incrementally to middle_egyptian_entries.json")
-    else:
-        print("Failed to parse entries. Check logs for details.")
+    log_listener = _start_logging()
+    try:
+        print(f"Checking for PDF file at {pdf_path}")
+        if not os.path.exists(pdf_path):
+            print(f"Error: PDF file not found at {pdf_path}")
+            logging.error(f"PDF file not found at {pdf_path}")
+            return
+        
+        print("Starting Middle Egyptian dictionary entry parsing...")
+        logging.info("Starting Middle Egyptian dictionary parsing...")
+        
+        entries = parse_pdf(pdf_path, verbose=True)
+        if entries:
+            print(f"Done! Entries saved incrementally to middle_egyptian_entries.json")
+        else:
+            print("Failed to parse entries. Check logs for details.")
+    finally:
+        log_listener.stop()  # Flushes queued records to the log file
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
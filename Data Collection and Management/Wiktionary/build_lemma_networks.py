@@ -28,10 +28,57 @@ Output: JSON with lemma networks suitable for training a temporal translation mo
 import json
 import re
 from collections import defaultdict
+from functools import lru_cache
 import sys
 
 sys.stdout.reconfigure(encoding='utf-8')
 
+# Trailing punctuation and {{...}} markup stripped from an "alternative form of" target
+_FORM_CLEANUP = re.compile(r'[.,;!?]$|\{\{.*?\}\}')
+
+# Ancestor templates in etymology text: {{inh|lang|ancestor_lang|form}} and {{m|lang|form}}
+@lru_cache(maxsize=None)
+def _inherited_template(current_lang):
+    return re.compile(r'\{\{inh\|' + re.escape(current_lang) + r'\|([^|]+)\|([^|}\s]+)')
+
+_MENTION_TEMPLATE = re.compile(r'\{\{m\|([^|]+)\|([^|}\s]+)')
+_HIERO_TAG = re.compile(r'<hiero>.*?</hiero>')
+
+# "[dialect] Alternative form of <form>" in a definition line; <form> is the
+# next whitespace-delimited word
+_ALTERNATIVE_FORM_OF = re.compile(r'(?:\[[^\]]+\]\s*)?[Aa]lternative form of\s+(\S+)')
+
+# Inflection markers in an alternative form's title/note. Matches of different
+# markers can't overlap, so finditer reports every kind present.
+_INFLECTION_MARKER = re.compile(
+    r'(?P<plural>plural|pl\.)|(?P<dual>dual)|(?P<feminine>feminine|fem\.)', re.IGNORECASE
+)
+
+# Plural form in an alternative-forms title: "writings of plural {{m-self|egy|lemma|plural_form}}"
+_M_SELF_PLURAL = re.compile(r'\{\{m-self\|egy\|[^|]+\|([^}]+)\}\}')
+
+# Dynasty numbers in attestation dates ("18th Dynasty") and period names ("18th")
+_DYNASTY_DATE = re.compile(r'(\d+)(?:st|nd|rd|th)\s+Dynasty')
+_DYNASTY_ORDINAL = re.compile(r'(\d+)(?:st|nd|rd|th)')
+
+# Chronological rank of textual periods (lower = earlier), keyed by lowercase name.
+# A period string gets the rank of the first name it contains, in this order.
+_PERIOD_RANKS = {
+    'pyramid texts': 1,
+    'old kingdom': 2,
+    'first intermediate period': 3,
+    'middle kingdom': 4,
+    'coffin texts': 4,  # Middle Kingdom era
+    'second intermediate period': 5,
+    'new kingdom': 6,
+    'book of the dead': 6,  # New Kingdom era
+    'third intermediate period': 7,
+    'late period': 8,
+    'late egyptian': 8,
+    'ptolemaic period': 9,
+    'greco-roman period': 10,
+}
+
 class LemmaNetworkBuilder:
     def __init__(self):
         self.networks = {}  # lemma_id -> network graph
@@ -45,6 +92,11 @@ class LemmaNetworkBuilder:
             'Late Period', 'Ptolemaic Period', 'Greco-Roman Period',
             'Pyramid Texts', 'Coffin Texts', 'Book of the Dead'
         ]
+        self._egyptian_periods_lower = [(p.lower(), p) for p in self.egyptian_periods]
+        
+        # Period strings repeat across thousands of alternative forms; cache the lookups
+        self.extract_period_from_date = lru_cache(maxsize=None)(self.extract_period_from_date)
+        self.get_period_rank = lru_cache(maxsize=None)(self.get_period_rank)
         
     def get_or_create_node_id(self, language, form, period=None, dialect=None, hieroglyphs=None, etymology_index=None):
         """Get existing node ID or create new one"""
@@ -52,10 +104,11 @@ class LemmaNetworkBuilder:
         # - variants with same transliteration but different glyphs
         # - different etymologies of the same form (e.g., mwt = "mother" vs "to die")
         key = (language, form, period or '', dialect or '', hieroglyphs or '', etymology_index if etymology_index is not None else '')
-        if key not in self.lemma_index:
-            self.lemma_index[key] = f"L{self.next_id:05d}"
+        node_id = self.lemma_index.get(key)
+        if node_id is None:
+            node_id = self.lemma_index[key] = f"L{self.next_id:05d}"
             self.next_id += 1
-        return self.lemma_index[key]
+        return node_id
     
     def create_node(self, node_id, language, form, part_of_speech, meanings, 
                     period=None, dialect=None, hieroglyphs=None, transliteration=None, etymology_index=None):
@@ -81,12 +134,13 @@ class LemmaNetworkBuilder:
             return None
         
         # Check for known periods
-        for period in self.egyptian_periods:
-            if period.lower() in date_str.lower():
+        date_lower = date_str.lower()
+        for period_lower, period in self._egyptian_periods_lower:
+            if period_lower in date_lower:
                 return period
         
         # Extract dynasty numbers
-        dynasty_match = re.search(r'(\d+)(?:st|nd|rd|th)\s+Dynasty', date_str)
+        dynasty_match = _DYNASTY_DATE.search(date_str)
         if dynasty_match:
             return f"{dynasty_match.group(1)}th Dynasty"
         
@@ -97,30 +151,18 @@ class LemmaNetworkBuilder:
         if not period:
             return 999
         
-        # Textual periods
-        period_rankings = {
-            'Pyramid Texts': 1,
-            'Old Kingdom': 2,
-            'First Intermediate Period': 3,
-            'Middle Kingdom': 4,
-            'Coffin Texts': 4,  # Middle Kingdom era
-            'Second Intermediate Period': 5,
-            'New Kingdom': 6,
-            'Book of the Dead': 6,  # New Kingdom era
-            'Third Intermediate Period': 7,
-            'Late Period': 8,
-            'Late Egyptian': 8,
-            'Ptolemaic Period': 9,
-            'Greco-Roman Period': 10,
-        }
-        
-        # Check if period is in our known rankings
-        for known_period, rank in period_rankings.items():
-            if known_period.lower() in period.lower():
+        # Check if period is in our known rankings; no known name contains an
+        # earlier one, so an exact match can skip the substring scan
+        period_lower = period.lower()
+        rank = _PERIOD_RANKS.get(period_lower)
+        if rank is not None:
+            return rank
+        for known_period, rank in _PERIOD_RANKS.items():
+            if known_period in period_lower:
                 return rank
         
         # Dynasty numbers (approximate chronology)
-        dynasty_match = re.search(r'(\d+)(?:st|nd|rd|th)', period)
+        dynasty_match = _DYNASTY_ORDINAL.search(period)
         if dynasty_match:
             dynasty_num = int(dynasty_match.group(1))
             # Map dynasties to approximate periods
@@ -147,19 +189,17 @@ class LemmaNetworkBuilder:
     def parse_etymology_for_ancestor(self, etymology_text, current_lang):
         """Extract ancestor language and form from etymology text"""
         # Pattern: {{inh|current_lang|ancestor_lang|ancestor_form|...}}
-        pattern = r'\{\{inh\|' + re.escape(current_lang) + r'\|([^|]+)\|([^|}\s]+)'
-        match = re.search(pattern, etymology_text)
+        match = _inherited_template(current_lang).search(etymology_text)
         
         if match:
             ancestor_lang = match.group(1).strip()
             ancestor_form = match.group(2).strip()
             # Remove HTML/hieroglyphs
-            ancestor_form = re.sub(r'<hiero>.*?</hiero>', '', ancestor_form)
+            ancestor_form = _HIERO_TAG.sub('', ancestor_form)
             return ancestor_lang, ancestor_form
         
         # Also check for {{m|lang|form}} patterns
-        pattern2 = r'\{\{m\|([^|]+)\|([^|}\s]+)'
-        match2 = re.search(pattern2, etymology_text)
+        match2 = _MENTION_TEMPLATE.search(etymology_text)
         if match2:
             return match2.group(1).strip(), match2.group(2).strip()
         
@@ -181,14 +221,12 @@ class LemmaNetworkBuilder:
         for defn in definitions:
             # Pattern: [dialect] Alternative form of <form>
             # or just: Alternative form of <form>
-            pattern = r'(?:\[[^\]]+\]\s*)?[Aa]lternative form of\s+(.+?)(?:\s|$)'
-            match = re.search(pattern, defn)
+            match = _ALTERNATIVE_FORM_OF.search(defn)
             
             if match:
                 target_form = match.group(1).strip()
                 # Remove any trailing punctuation or markup
-                target_form = re.sub(r'[.,;!?]$', '', target_form)
-                target_form = re.sub(r'\{\{.*?\}\}', '', target_form).strip()
+                target_form = _FORM_CLEANUP.sub('', target_form).strip()
                 
                 # For now, assume same language (will be refined per language processing)
                 return None, target_form  # Language will be set by caller
@@ -233,6 +271,34 @@ class LemmaNetworkBuilder:
         """Process Egyptian lemmas with temporal evolution via alternative forms"""
         node_count = 0
         
+        # Node ids and (from, to) edge pairs already in each network, so the
+        # duplicate checks below are set lookups rather than list scans.
+        # Every node/edge added to a network here goes through add_node/add_edge.
+        node_ids = {}
+        edge_pairs = {}
+        
+        def add_node(network_id, node):
+            """Append node unless the network already has its id; returns whether it was added"""
+            if network_id not in node_ids:
+                node_ids[network_id] = {n['id'] for n in self.networks[network_id]['nodes']}
+            ids = node_ids[network_id]
+            if node['id'] in ids:
+                return False
+            ids.add(node['id'])
+            self.networks[network_id]['nodes'].append(node)
+            return True
+        
+        def add_edge(network_id, edge, unique=False):
+            """Append edge; with unique=True, skip it if the network already has a from→to edge"""
+            if network_id not in edge_pairs:
+                edge_pairs[network_id] = {(e.get('from'), e.get('to')) for e in self.networks[network_id]['edges']}
+            pairs = edge_pairs[network_id]
+            pair = (edge['from'], edge['to'])
+            if unique and pair in pairs:
+                return
+            pairs.add(pair)
+            self.networks[network_id]['edges'].append(edge)
+        
         for lemma_form, entry in egy_data.items():
             for etym_idx, etym in enumerate(entry.get('etymologies', [])):
                 for defn in etym.get('definitions', []):
@@ -257,28 +323,22 @@ class LemmaNetworkBuilder:
                             }
                             node_count += 1
                         
-                        network = self.networks[target_id]
-                        
                         # Create node for this alternative form
                         alt_id = self.get_or_create_node_id('egy', lemma_form, etymology_index=etym_idx)
                         alt_node = self.create_node(alt_id, 'egy', lemma_form, pos, meanings, etymology_index=etym_idx)
                         
                         # Add node if not already present
-                        if not any(n['id'] == alt_id for n in network['nodes']):
-                            network['nodes'].append(alt_node)
+                        if add_node(target_id, alt_node):
                             node_count += 1
                         
                         # Create VARIANT edge from target to this form
-                        edge_exists = any(e.get('from') == target_id and e.get('to') == alt_id 
-                                        for e in network['edges'])
-                        if not edge_exists:
-                            edge = {
-                                'from': target_id,
-                                'to': alt_id,
-                                'type': 'VARIANT',
-                                'notes': f'Alternative form of {alt_form_target}'
-                            }
-                            network['edges'].append(edge)
+                        edge = {
+                            'from': target_id,
+                            'to': alt_id,
+                            'type': 'VARIANT',
+                            'notes': f'Alternative form of {alt_form_target}'
+                        }
+                        add_edge(target_id, edge, unique=True)
                         
                         # Skip normal processing for this entry
                         continue
@@ -314,25 +374,26 @@ class LemmaNetworkBuilder:
                         title = alt_form.get('title', '')
                         note = alt_form.get('note', '')
                         
-                        # Detect inflection type from title/note
-                        inflection_info = f"{title} {note}".lower()
+                        # Detect inflection type from title/note (plural wins over dual over feminine);
+                        # most alternative forms have neither
+                        markers = {m.lastgroup for text in (title, note) if text
+                                   for m in _INFLECTION_MARKER.finditer(text)}
                         inflection_type = 'base'
                         inflection_form = ''
                         
-                        if 'plural' in inflection_info or 'pl.' in inflection_info:
+                        if 'plural' in markers:
                             inflection_type = 'plural'
                             # Try to extract the plural form from title
                             # Pattern: "writings of plural {{m-self|egy|lemma|plural_form}}"
-                            import re
-                            plural_match = re.search(r'\{\{m-self\|egy\|[^|]+\|([^}]+)\}\}', title)
+                            plural_match = _M_SELF_PLURAL.search(title)
                             if plural_match:
                                 inflection_form = plural_match.group(1)
                             else:
                                 inflection_form = alt_translit
-                        elif 'dual' in inflection_info:
+                        elif 'dual' in markers:
                             inflection_type = 'dual'
                             inflection_form = alt_translit
-                        elif 'feminine' in inflection_info or 'fem.' in inflection_info:
+                        elif 'feminine' in markers:
                             inflection_type = 'feminine'
                             inflection_form = alt_translit
                         
@@ -372,27 +433,21 @@ class LemmaNetworkBuilder:
                             
                             # Try to add to target network if it exists
                             if variant_id in self.networks:
-                                network = self.networks[variant_id]
+                                # Add this lemma as a variant node (its id is main_id);
+                                # each network gets its own copy of the node
+                                alt_node = self.create_node(main_id, 'egy', lemma_form, pos, meanings, etymology_index=etym_idx)
                                 
-                                # Add this lemma as a variant node
-                                alt_id = self.get_or_create_node_id('egy', lemma_form, etymology_index=etym_idx)
-                                alt_node = self.create_node(alt_id, 'egy', lemma_form, pos, meanings, etymology_index=etym_idx)
-                                
-                                if not any(n['id'] == alt_id for n in network['nodes']):
-                                    network['nodes'].append(alt_node)
+                                if add_node(variant_id, alt_node):
                                     node_count += 1
                                 
                                 # Create VARIANT edge from variant_form to this lemma
-                                edge_exists = any(e.get('from') == variant_id and e.get('to') == alt_id 
-                                                for e in network['edges'])
-                                if not edge_exists:
-                                    edge = {
-                                        'from': variant_id,
-                                        'to': alt_id,
-                                        'type': 'VARIANT',
-                                        'notes': f'Alternative form of {variant_form} (from definition)'
-                                    }
-                                    network['edges'].append(edge)
+                                edge = {
+                                    'from': variant_id,
+                                    'to': main_id,
+                                    'type': 'VARIANT',
+                                    'notes': f'Alternative form of {variant_form} (from definition)'
+                                }
+                                add_edge(variant_id, edge, unique=True)
                     
                     # Create separate networks for each inflection type
                     for (inflection_type, inflection_form), all_forms in forms_by_inflection.items():
@@ -424,8 +479,7 @@ class LemmaNetworkBuilder:
                         
                         # Add all nodes (avoiding duplicates)
                         for form_data in all_forms:
-                            if not any(n['id'] == form_data['id'] for n in network['nodes']):
-                                network['nodes'].append(form_data['node'])
+                            if add_node(network_id, form_data['node']):
                                 node_count += 1
                         
                         # Create edges between dated forms
@@ -457,7 +511,7 @@ class LemmaNetworkBuilder:
                                     'type': 'DESCENDS',
                                     'notes': f"First attestation in {earliest_forms[0].get('period', 'dated period')}"
                                 }
-                                network['edges'].append(edge)
+                                add_edge(network_id, edge)
                         
                         # For EVOLVES edges: Connect chronologically consecutive alternative forms
                         # These represent temporal evolution of the same word (different writings over time)
@@ -479,14 +533,9 @@ class LemmaNetworkBuilder:
                                         'type': 'EVOLVES',
                                         'notes': f"Evolution from {curr_form.get('period', '?')} to {next_forms[0].get('period', '?')}"
                                     }
-                                    network['edges'].append(edge)
+                                    add_edge(network_id, edge)
                             
-                            # If multiple forms exist in the next period, connect them as variants
-                            if len(next_forms) > 1:
-                                # Connect subsequent forms in the same period as VARIANT edges
-                                for j in range(1, len(next_forms)):
-                                    # Already handled by VARIANT logic below
-                                    pass
+                            # Multiple forms in the next period are linked as VARIANTs below
                         
                         # Create VARIANT edges: Different forms in the same period
                         for period_rank, forms in by_period.items():
@@ -499,8 +548,14 @@ class LemmaNetworkBuilder:
                                         by_translit_in_period[translit] = []
                                     by_translit_in_period[translit].append(form_data)
                                 
-                                # Connect different hieroglyphic writings of same transliteration (true variants)
+                                # Connect different hieroglyphic writings of same transliteration (true variants),
+                                # picking the most common transliteration (first on ties) on the way
+                                canonical_translit = None
+                                canonical_count = 0
                                 for translit, translit_forms in by_translit_in_period.items():
+                                    if len(translit_forms) > canonical_count:
+                                        canonical_translit = translit
+                                        canonical_count = len(translit_forms)
                                     if len(translit_forms) > 1:
                                         # Connect all to first one as the canonical form
                                         canonical = translit_forms[0]
@@ -518,12 +573,11 @@ class LemmaNetworkBuilder:
                                                 'type': 'VARIANT',
                                                 'notes': f"Hieroglyphic variant ({period_str})"
                                             }
-                                            network['edges'].append(edge)
+                                            add_edge(network_id, edge)
                                 
                                 # Connect different transliterations in same period (spelling variants)
                                 if len(by_translit_in_period) > 1:
-                                    # Pick most common as canonical
-                                    canonical_translit = max(by_translit_in_period.items(), key=lambda x: len(x[1]))[0]
+                                    # Most common one is canonical
                                     canonical_form = by_translit_in_period[canonical_translit][0]
                                     
                                     for translit, translit_forms in by_translit_in_period.items():
@@ -541,7 +595,7 @@ class LemmaNetworkBuilder:
                                                 'type': 'VARIANT',
                                                 'notes': f"Spelling variant ({period_str})"
                                             }
-                                            network['edges'].append(edge)
+                                            add_edge(network_id, edge)
                         
                         # Add descendants (to Demotic/Coptic) - only from base form network
                         if inflection_type == 'base':
@@ -580,9 +634,8 @@ class LemmaNetworkBuilder:
                                     desc_id = self.get_or_create_node_id(desc_lang_code, desc_word)
                                     
                                     # Add node to network if not already there
-                                    if not any(n['id'] == desc_id for n in network['nodes']):
-                                        desc_node = self.create_node(desc_id, desc_lang_code, desc_word, pos, [])
-                                        network['nodes'].append(desc_node)
+                                    desc_node = self.create_node(desc_id, desc_lang_code, desc_word, pos, [])
+                                    add_node(network_id, desc_node)
                                     
                                     # Create edge from latest Egyptian form (not root)
                                     # Note: Egyptian→Coptic edges will be rerouted through Demotic
@@ -593,7 +646,7 @@ class LemmaNetworkBuilder:
                                         'type': 'DESCENDS',
                                         'target_language': desc_lang
                                     }
-                                    network['edges'].append(edge)
+                                    add_edge(network_id, edge)
                             
                             # Add etymology components (morphological composition: prefix/suffix/compound)
                             for component_info in etym.get('etymology_components', []):
@@ -613,8 +666,7 @@ class LemmaNetworkBuilder:
                                             component_id, 'egy', component_form, 'morpheme', []
                                         )
                                         
-                                        if not any(n['id'] == component_id for n in network['nodes']):
-                                            network['nodes'].append(component_node)
+                                        if add_node(network_id, component_node):
                                             node_count += 1
                                         
                                         # Create COMPONENT edge (component → derived word)
@@ -625,9 +677,8 @@ class LemmaNetworkBuilder:
                                             'type': 'COMPONENT',
                                             'notes': f'{component_role}: {component_form}'
                                         }
-                                        # Check if edge already exists
-                                        if not any(e.get('from') == component_id and e.get('to') == main_id for e in network['edges']):
-                                            network['edges'].append(edge)
+                                        # Skip if the edge already exists
+                                        add_edge(network_id, edge, unique=True)
                                     
                                     # For compounds: create COMPONENT edges from each component to compound
                                     elif template_type == 'compound':
@@ -636,8 +687,7 @@ class LemmaNetworkBuilder:
                                             component_id, 'egy', component_form, 'word', []
                                         )
                                         
-                                        if not any(n['id'] == component_id for n in network['nodes']):
-                                            network['nodes'].append(component_node)
+                                        if add_node(network_id, component_node):
                                             node_count += 1
                                         
                                         # Create COMPONENT edge (component → compound)
@@ -647,9 +697,8 @@ class LemmaNetworkBuilder:
                                             'type': 'COMPONENT',
                                             'notes': f'compound component: {component_form}'
                                         }
-                                        # Check if edge already exists
-                                        if not any(e.get('from') == component_id and e.get('to') == main_id for e in network['edges']):
-                                            network['edges'].append(edge)
+                                        # Skip if the edge already exists
+                                        add_edge(network_id, edge, unique=True)
         
         return node_count
     
@@ -790,6 +839,28 @@ class LemmaNetworkBuilder:
         """Process Coptic lemmas with dialectal variants and inheritance"""
         node_count = 0
         
+        # First node with each id, and with each (language, form), across all
+        # networks in network order, i.e. what scanning self.networks.values()
+        # would find. Kept current as nodes are added below.
+        network_pos = {network_id: pos for pos, network_id in enumerate(self.networks)}
+        first_by_id = {}
+        first_by_form = {}
+        
+        def index_node(network_id, node):
+            pos = network_pos.setdefault(network_id, len(network_pos))
+            for index, key in ((first_by_id, node['id']),
+                               (first_by_form, (node.get('language'), node.get('form')))):
+                if key not in index or pos < index[key][0]:
+                    index[key] = (pos, node)
+        
+        def find_node(index, key):
+            entry = index.get(key)
+            return entry[1] if entry else None
+        
+        for network_id, net in self.networks.items():
+            for n in net['nodes']:
+                index_node(network_id, n)
+        
         for lemma_form, entry in cop_data.items():
             for etym_idx, etym in enumerate(entry.get('etymologies', [])):
                 etym_text = etym.get('etymology_text', '')
@@ -845,6 +916,7 @@ class LemmaNetworkBuilder:
                             'has_demotic_descendant': False
                         }
                         network = self.networks[cop_id]
+                        index_node(cop_id, cop_node)
                         node_count += 1
                     else:
                         network = self.networks[cop_id]
@@ -857,19 +929,19 @@ class LemmaNetworkBuilder:
                         target_id = self.get_or_create_node_id('cop', alt_form_target)
                         
                         # Search for existing target node to link to
-                        for net in self.networks.values():
-                            target_node = next((n for n in net['nodes'] if n['id'] == target_id), None)
-                            if target_node:
-                                parent_id = target_id
-                                # Add target node to current network if not already there
-                                if not any(n['id'] == target_id for n in network['nodes']):
-                                    network['nodes'].append(target_node)
-                                break
+                        target_node = find_node(first_by_id, target_id)
+                        if target_node:
+                            parent_id = target_id
+                            # Add target node to current network if not already there
+                            if not any(n['id'] == target_id for n in network['nodes']):
+                                network['nodes'].append(target_node)
+                                index_node(cop_id, target_node)
                         
                         # If target not found, create placeholder
                         if not parent_id:
                             target_node = self.create_node(target_id, 'cop', alt_form_target, pos, [])
                             network['nodes'].append(target_node)
+                            index_node(cop_id, target_node)
                             parent_id = target_id
                     
                     # If not an alternative form, add ancestor node to this network
@@ -879,11 +951,7 @@ class LemmaNetworkBuilder:
                             parent_id = self.get_or_create_node_id('dem', ancestor_form_dem)
                             
                             # Check if Demotic node exists in any network
-                            parent_node = None
-                            for net in self.networks.values():
-                                parent_node = next((n for n in net['nodes'] if n['id'] == parent_id), None)
-                                if parent_node:
-                                    break
+                            parent_node = find_node(first_by_id, parent_id)
                             
                             # If not found, create placeholder Demotic node
                             if not parent_node:
@@ -892,17 +960,14 @@ class LemmaNetworkBuilder:
                             # Add Demotic node to current network if not already there
                             if not any(n['id'] == parent_id for n in network['nodes']):
                                 network['nodes'].append(parent_node)
+                                index_node(cop_id, parent_node)
                         
                         # Try Egyptian ancestor
                         elif ancestor_lang_dem == 'egy':
                             parent_id = self.get_or_create_node_id('egy', ancestor_form_dem)
                             
                             # Check if Egyptian node exists in any network
-                            parent_node = None
-                            for net in self.networks.values():
-                                parent_node = next((n for n in net['nodes'] if n['id'] == parent_id), None)
-                                if parent_node:
-                                    break
+                            parent_node = find_node(first_by_id, parent_id)
                             
                             # If not found, create placeholder Egyptian node
                             if not parent_node:
@@ -911,17 +976,14 @@ class LemmaNetworkBuilder:
                             # Add Egyptian node to current network if not already there
                             if not any(n['id'] == parent_id for n in network['nodes']):
                                 network['nodes'].append(parent_node)
+                                index_node(cop_id, parent_node)
                         
                         # Handle any other language (Greek, Latin, etc.)
                         else:
                             parent_id = self.get_or_create_node_id(ancestor_lang_dem, ancestor_form_dem)
                             
                             # Check if ancestor node exists in any network
-                            parent_node = None
-                            for net in self.networks.values():
-                                parent_node = next((n for n in net['nodes'] if n['id'] == parent_id), None)
-                                if parent_node:
-                                    break
+                            parent_node = find_node(first_by_id, parent_id)
                             
                             # If not found, create placeholder node
                             if not parent_node:
@@ -930,6 +992,7 @@ class LemmaNetworkBuilder:
                             # Add ancestor node to current network if not already there
                             if not any(n['id'] == parent_id for n in network['nodes']):
                                 network['nodes'].append(parent_node)
+                                index_node(cop_id, parent_node)
                     
                     # Create inheritance edge if has parent
                     if parent_id:
@@ -970,6 +1033,7 @@ class LemmaNetworkBuilder:
                             
                             if not any(n['id'] == alt_id for n in network['nodes']):
                                 network['nodes'].append(alt_node)
+                                index_node(cop_id, alt_node)
                                 node_count += 1
                             
                             # Create variant edge
@@ -990,11 +1054,7 @@ class LemmaNetworkBuilder:
                             variant_id = self.get_or_create_node_id('cop', variant_form, etymology_index=etym_idx)
                             
                             # Try to find the target variant in existing networks
-                            variant_node = None
-                            for net in self.networks.values():
-                                variant_node = next((n for n in net['nodes'] if n['id'] == variant_id), None)
-                                if variant_node:
-                                    break
+                            variant_node = find_node(first_by_id, variant_id)
                             
                             # If target not found, create placeholder
                             if not variant_node:
@@ -1003,6 +1063,7 @@ class LemmaNetworkBuilder:
                             # Add variant node to current network if not already there
                             if not any(n['id'] == variant_id for n in network['nodes']):
                                 network['nodes'].append(variant_node)
+                                index_node(cop_id, variant_node)
                             
                             # Create VARIANT edge from variant_form to this lemma
                             edge_exists = any(e.get('from') == variant_id and e.get('to') == cop_id 
@@ -1026,6 +1087,7 @@ class LemmaNetworkBuilder:
                             
                             if not any(n['id'] == derived_id for n in network['nodes']):
                                 network['nodes'].append(derived_node)
+                                index_node(cop_id, derived_node)
                                 node_count += 1
                             
                             # Create DERIVED edge (base → derived)
@@ -1066,6 +1128,7 @@ class LemmaNetworkBuilder:
                             
                             if not any(n['id'] == comp_id for n in network['nodes']):
                                 network['nodes'].append(comp_node)
+                                index_node(cop_id, comp_node)
                                 node_count += 1
                             
                             # Create COMPONENT edge to Demotic ancestor
@@ -1088,25 +1151,21 @@ class LemmaNetworkBuilder:
                                 # First, check if this base component already exists GLOBALLY
                                 # (ignoring etymology_index to avoid duplicates)
                                 # Search in ALL networks, not just the current one
-                                existing_component = None
-                                for other_net in self.networks.values():
-                                    existing_component = next((n for n in other_net['nodes'] 
-                                                              if n.get('language') == component_lang 
-                                                              and n.get('form') == component_form), None)
-                                    if existing_component:
-                                        break
+                                existing_component = find_node(first_by_form, (component_lang, component_form))
                                 
                                 if existing_component:
                                     component_id = existing_component['id']
                                     # Add the existing node to current network if not already there
                                     if not any(n['id'] == component_id for n in network['nodes']):
                                         network['nodes'].append(existing_component)
+                                        index_node(cop_id, existing_component)
                                 else:
                                     component_id = self.get_or_create_node_id(component_lang, component_form)
                                     component_node = self.create_node(
                                         component_id, component_lang, component_form, 'word', []
                                     )
                                     network['nodes'].append(component_node)
+                                    index_node(cop_id, component_node)
                                     node_count += 1
                                 
                                 # Create DERIVED edge (base → affixed word)
@@ -1152,6 +1211,7 @@ class LemmaNetworkBuilder:
                             
                             if not any(n['id'] == component_id for n in network['nodes']):
                                 network['nodes'].append(component_node)
+                                index_node(cop_id, component_node)
                                 node_count += 1
                             
                             # Create COMPONENT edge (component → compound)
@@ -1264,14 +1324,17 @@ class LemmaNetworkBuilder:
         removed_count = 0
         
         for network_id, network in self.networks.items():
+            # Only edges change below, so one id -> node index serves the whole network
+            nodes_by_id = {n['id']: n for n in network['nodes']}
+            
             # Find all Egyptian→Coptic DESCENDS edges that could potentially be rerouted
             for edge in network['edges'][:]:  # Copy list to avoid modification during iteration
                 if edge['type'] != 'DESCENDS':
                     continue
                 
                 # Get source and target nodes
-                source_node = next((n for n in network['nodes'] if n['id'] == edge['from']), None)
-                target_node = next((n for n in network['nodes'] if n['id'] == edge['to']), None)
+                source_node = nodes_by_id.get(edge['from'])
+                target_node = nodes_by_id.get(edge['to'])
                 
                 if not source_node or not target_node:
                     continue
@@ -1284,14 +1347,15 @@ class LemmaNetworkBuilder:
                         e for e in network['edges']
                         if (e['type'] == 'DESCENDS' and 
                             e['from'] == source_node['id'] and
-                            next((n for n in network['nodes'] if n['id'] == e['to'] and n['language'] in ['dem', 'egx-dem']), None))
+                            e['to'] in nodes_by_id and
+                            nodes_by_id[e['to']]['language'] in ['dem', 'egx-dem'])
                     ]
                     
                     # If there's a Demotic descendant of this Egyptian word, reroute through it
                     if egy_to_dem_edges:
                         # Use the first Demotic descendant
                         demotic_id = egy_to_dem_edges[0]['to']
-                        demotic_node = next((n for n in network['nodes'] if n['id'] == demotic_id), None)
+                        demotic_node = nodes_by_id.get(demotic_id)
                         
                         # Only reroute if the Demotic node has meanings (not a placeholder)
                         if demotic_node and demotic_node.get('meanings'):
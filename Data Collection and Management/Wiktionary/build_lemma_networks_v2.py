@@ -14,7 +14,13 @@ Each network is ego-centric - focused on ONE lemma, not merged into mega-network
 import json
 import re
 from collections import defaultdict
+from functools import lru_cache
 
+# Egyptian ancestor in a Demotic/Coptic etymology, e.g. {{inh|cop|egy|form}}.
+# Both patterns need a literal "|egy|", which is checked first as a cheap prefilter.
+_DEMOTIC_EGY_ANCESTOR = re.compile(r'\{\{(?:inh|der|bor)\|(?:dem|egx-dem)\|egy\|([^|}]+)')
+_COPTIC_EGY_ANCESTOR = re.compile(r'\{\{(?:inh|der|bor)\|cop[^|]*\|egy\|([^|}]+)')
+_HTML_TAG = re.compile(r'<[^>]+>')
 
 class EgocentricLemmaNetworkBuilder:
     """Build ego-centric lemma networks - one per lemma etymology"""
@@ -30,6 +36,11 @@ class EgocentricLemmaNetworkBuilder:
             'Middle Kingdom', 'Second Intermediate Period', 'New Kingdom',
             'Third Intermediate Period', 'Late Period', 'Ptolemaic', 'Roman'
         ]
+        
+        # get_period_rank rebuilds its rankings dict per call, and both only see
+        # a few distinct period strings, so cache them per builder
+        self.extract_period_from_date = lru_cache(maxsize=None)(self.extract_period_from_date)
+        self.get_period_rank = lru_cache(maxsize=None)(self.get_period_rank)
     
     def get_new_node_id(self):
         """Generate a new unique node ID"""
@@ -805,6 +816,8 @@ class EgocentricLemmaNetworkBuilder:
         
         for network in self.networks:
             edges_to_remove = []
+            # Only edges change below, so one id -> node index serves the whole network
+            nodes_by_id = {n['id']: n for n in network['nodes']}
             
             # Get all Egyptian nodes and sort by period
             egy_nodes = [n for n in network['nodes'] if n['language'] == 'egy']
@@ -835,8 +848,8 @@ class EgocentricLemmaNetworkBuilder:
             # Build a map of what descendants connect from which Egyptian nodes
             egy_to_descendants = {}  # egy_id -> set of descendant_ids
             for edge in descends_edges:
-                from_node = next((n for n in network['nodes'] if n['id'] == edge['from']), None)
-                to_node = next((n for n in network['nodes'] if n['id'] == edge['to']), None)
+                from_node = nodes_by_id.get(edge['from'])
+                to_node = nodes_by_id.get(edge['to'])
                 
                 if from_node and to_node and from_node['language'] == 'egy':
                     if from_node['id'] not in egy_to_descendants:
@@ -849,8 +862,8 @@ class EgocentricLemmaNetworkBuilder:
             
             all_descendants = set()  # All dem/cop descendants in the network
             for edge in descends_edges:
-                from_node = next((n for n in network['nodes'] if n['id'] == edge['from']), None)
-                to_node = next((n for n in network['nodes'] if n['id'] == edge['to']), None)
+                from_node = nodes_by_id.get(edge['from'])
+                to_node = nodes_by_id.get(edge['to'])
                 
                 if from_node and to_node:
                     if from_node['language'] == 'egy' and to_node['language'] in ['dem', 'cop']:
@@ -866,7 +879,7 @@ class EgocentricLemmaNetworkBuilder:
             for desc_id in all_descendants:
                 if desc_id not in latest_descendants:
                     # Add missing edge from latest to this descendant
-                    desc_node = next(n for n in network['nodes'] if n['id'] == desc_id)
+                    desc_node = nodes_by_id[desc_id]
                     edge = self.create_edge(
                         from_id=latest_egy_node['id'],
                         to_id=desc_id,
@@ -882,8 +895,8 @@ class EgocentricLemmaNetworkBuilder:
             # Rebuild the egy_to_descendants map with the updated edges
             egy_to_descendants = {}
             for edge in descends_edges:
-                from_node = next((n for n in network['nodes'] if n['id'] == edge['from']), None)
-                to_node = next((n for n in network['nodes'] if n['id'] == edge['to']), None)
+                from_node = nodes_by_id.get(edge['from'])
+                to_node = nodes_by_id.get(edge['to'])
                 
                 if from_node and to_node and from_node['language'] == 'egy':
                     if from_node['id'] not in egy_to_descendants:
@@ -893,8 +906,8 @@ class EgocentricLemmaNetworkBuilder:
             # Build a map of Demotic→Coptic edges
             dem_to_cop = {}  # dem_id -> set of cop_ids
             for edge in descends_edges:
-                from_node = next((n for n in network['nodes'] if n['id'] == edge['from']), None)
-                to_node = next((n for n in network['nodes'] if n['id'] == edge['to']), None)
+                from_node = nodes_by_id.get(edge['from'])
+                to_node = nodes_by_id.get(edge['to'])
                 
                 if from_node and to_node and from_node['language'] == 'dem' and to_node['language'] == 'cop':
                     if from_node['id'] not in dem_to_cop:
@@ -905,7 +918,7 @@ class EgocentricLemmaNetworkBuilder:
             coptic_via_demotic = set()
             for egy_id, dem_ids in egy_to_descendants.items():
                 for dem_id in dem_ids:
-                    dem_node = next((n for n in network['nodes'] if n['id'] == dem_id), None)
+                    dem_node = nodes_by_id.get(dem_id)
                     if dem_node and dem_node['language'] == 'dem':
                         # Get Coptic descendants of this Demotic node
                         cop_ids = dem_to_cop.get(dem_id, set())
@@ -916,8 +929,8 @@ class EgocentricLemmaNetworkBuilder:
                 if edge in edges_to_remove:
                     continue  # Already marked for removal
                 
-                from_node = next((n for n in network['nodes'] if n['id'] == edge['from']), None)
-                to_node = next((n for n in network['nodes'] if n['id'] == edge['to']), None)
+                from_node = nodes_by_id.get(edge['from'])
+                to_node = nodes_by_id.get(edge['to'])
                 
                 if from_node and to_node:
                     if from_node['language'] == 'egy' and to_node['language'] == 'cop':
@@ -1062,15 +1075,15 @@ class EgocentricLemmaNetworkBuilder:
     
     def extract_egyptian_ancestor(self, etym_text):
         """Extract Egyptian ancestor form from etymology text"""
-        if not etym_text:
+        if not etym_text or '|egy|' not in etym_text:
             return None
         
         # Look for {{inh|dem|egy|form}} or similar patterns
-        match = re.search(r'\{\{(?:inh|der|bor)\|(?:dem|egx-dem)\|egy\|([^|}]+)', etym_text)
+        match = _DEMOTIC_EGY_ANCESTOR.search(etym_text)
         if match:
             ancestor = match.group(1).strip()
             # Remove any HTML tags
-            ancestor = re.sub(r'<[^>]+>', '', ancestor)
+            ancestor = _HTML_TAG.sub('', ancestor)
             return ancestor
         
         return None
@@ -1158,15 +1171,15 @@ class EgocentricLemmaNetworkBuilder:
     
     def extract_coptic_egyptian_ancestor(self, etym_text):
         """Extract Egyptian ancestor form from Coptic etymology text"""
-        if not etym_text:
+        if not etym_text or '|egy|' not in etym_text:
             return None
         
         # Look for {{inh|cop|egy|form}} or similar patterns
-        match = re.search(r'\{\{(?:inh|der|bor)\|cop[^|]*\|egy\|([^|}]+)', etym_text)
+        match = _COPTIC_EGY_ANCESTOR.search(etym_text)
         if match:
             ancestor = match.group(1).strip()
             # Remove any HTML tags
-            ancestor = re.sub(r'<[^>]+>', '', ancestor)
+            ancestor = _HTML_TAG.sub('', ancestor)
             return ancestor
         
         return None
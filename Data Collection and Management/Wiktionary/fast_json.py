@@ -0,0 +1,13 @@
+"""
+JSON loading shared by the Wiktionary scripts: orjson when it is installed,
+the standard library otherwise. `loads` takes str or bytes, so the large
+lemma and network files can be read in binary mode.
+"""
+import json
+
+try:
+    import orjson  # optional: much faster load/dump of the multi-MB lemma files
+except ImportError:
+    orjson = None
+
+loads = orjson.loads if orjson is not None else json.loads
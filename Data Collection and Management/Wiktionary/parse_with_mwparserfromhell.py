@@ -3,12 +3,77 @@ Parser for Egyptian, Demotic, and Coptic Wiktionary lemmas using mwparserfromhel
 This is a cleaner, more robust implementation than regex-based parsing.
 """
 
+import hashlib
 import json
+import re
+import sqlite3
 import mwparserfromhell
+from mwparserfromhell.nodes import ExternalLink, Tag, Template, Text, Wikilink
+from functools import lru_cache, partial
+from multiprocessing import Pool
 from typing import Dict, List, Optional
 import sys
+from collections import Counter
 from pathlib import Path
 
+from fast_json import orjson, loads as _json_loads
+
+def _dumps_json(obj) -> bytes:
+    """Serialize obj as indented UTF-8 JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+@lru_cache(maxsize=None)
+def _def_line_pattern(level: int):
+    """A definition line at exactly this nesting level (number of leading '#')."""
+    return re.compile(rf"^#{{{level}}}(?!#).*$", re.MULTILINE)
+
+# {{egy-hieroforms}} parameters: N (hieroglyphs) or readN/dateN/noteN (metadata for form N)
+_HIEROFORM_PARAM = re.compile(r"(read|date|note)?([1-9][0-9]*)")
+_HIEROFORM_FIELDS = {'read': 'transliteration', 'date': 'date', 'note': 'note'}
+
+# "Alternative form of X" / "Alternate spelling of X" in a definition
+_ALT_FORM_OF = re.compile(r'(?:Alternative|Alternate)\s+(?:form|spelling|orthography)\s+of\s+(\S+)', re.IGNORECASE)
+# The {{desc}} template on a descendants line, and the word in a {{l|lang|word}} link
+_DESC_TEMPLATE = re.compile(r'\{\{desc\|(.+)\}\}')
+_LINK_WORD = re.compile(r'\{\{l\|[^|]+\|([^}|]+)')
+
+# Part-of-speech section headings
+_POS_HEADINGS = frozenset({
+    'Noun', 'Verb', 'Adjective', 'Adverb', 'Particle', 'Proper noun',
+    'Preposition', 'Pronoun', 'Numeral', 'Letter', 'Determiner'
+})
+# Headings that end the etymology text (historically without 'Determiner')
+_ETYM_TEXT_END_HEADINGS = _POS_HEADINGS - {'Determiner'}
+# Substrings of POS header template names, e.g. {{egy-verb}}, {{cop-noun}}
+_POS_TEMPLATE_KEYWORDS = ('noun', 'verb', 'adj', 'adv', 'part', 'prep', 'pron', 'num', 'proper')
+
+def _is_pos_heading(title) -> bool:
+    """get_sections() matcher for part-of-speech headings."""
+    return str(title).strip() in _POS_HEADINGS
+
+@lru_cache(maxsize=None)
+def _heading_matcher(pattern: str):
+    """
+    get_sections() matcher equivalent to passing matches=pattern, but compiled
+    once per pattern instead of going through re.search on every heading.
+    """
+    search = re.compile(pattern, re.IGNORECASE | re.DOTALL).search
+    return lambda title: search(str(title))
+
+def _sections_titled(sections, matcher) -> List:
+    """Sections from a get_sections(include_lead=False) list whose heading title matches."""
+    return [s for s in sections if matcher(s.nodes[0].title)]
+
+# Coptic dialects in {{alter}}: single-letter codes and full names
+_DIALECT_CODES = {'L': 'Lycopolitan', 'A': 'Akhmimic', 'B': 'Bohairic',
+                  'S': 'Sahidic', 'F': 'Fayyumic', 'P': 'Proto-Coptic',
+                  'V': 'Sub-Akhmimic'}
+_DIALECT_NAMES = frozenset(_DIALECT_CODES.values())
+# Dialect names recognised in POS-level {{alter}} templates
+_POS_ALTER_DIALECTS = frozenset({'Akhmimic', 'Bohairic', 'Sahidic', 'Fayyumic', 'Lycopolitan'})
+
 def parse_template_params(template) -> Dict[str, str]:
     """Extract all parameters from a template as a dictionary."""
     params = {}
@@ -34,11 +99,18 @@ def parse_egy_hieroforms(template) -> List[Dict[str, str]]:
     # Where numbered params (1, 2, 3...) are the hieroglyphs
     # and date1, note1, read1 etc. are metadata for that form
     
-    # Collect numbered hieroglyph parameters
+    # Bucket numbered hieroglyph parameters and their metadata in one pass
     hieroglyphs_by_index = {}
-    for i in range(1, 100):  # Reasonable upper limit
-        if str(i) in params:
-            hieroglyphs_by_index[i] = params[str(i)]
+    metadata_by_index = {}
+    for key, value in params.items():
+        match = _HIEROFORM_PARAM.fullmatch(key)
+        if not match:
+            continue
+        prefix, index = match.groups()
+        if prefix:
+            metadata_by_index.setdefault(int(index), {})[_HIEROFORM_FIELDS[prefix]] = value
+        else:
+            hieroglyphs_by_index[int(index)] = value
     
     # Build alternative forms from hieroglyphs and their metadata
     for i in sorted(hieroglyphs_by_index.keys()):
@@ -47,12 +119,10 @@ def parse_egy_hieroforms(template) -> List[Dict[str, str]]:
         }
         
         # Add metadata if present
-        if f'read{i}' in params:
-            form_entry['transliteration'] = params[f'read{i}']
-        if f'date{i}' in params:
-            form_entry['date'] = params[f'date{i}']
-        if f'note{i}' in params:
-            form_entry['note'] = params[f'note{i}']
+        metadata = metadata_by_index.get(i, {})
+        for field in ('transliteration', 'date', 'note'):
+            if field in metadata:
+                form_entry[field] = metadata[field]
         if title:
             form_entry['title'] = title
         
@@ -60,71 +130,116 @@ def parse_egy_hieroforms(template) -> List[Dict[str, str]]:
     
     return alt_forms
 
+def _render_labels(template) -> str:
+    # Labels like {{lb|egy|intransitive}}
+    labels = [str(p.value).strip() for p in template.params[1:]]
+    return f"[{', '.join(labels)}]"
+
+def _render_defdate(template) -> str:
+    params = parse_template_params(template)
+    date_str = list(params.values())[0] if params else ''
+    return f"(dated: {date_str})"
+
+def _render_non_gloss(template) -> str:
+    # Non-gloss definition
+    params = parse_template_params(template)
+    return list(params.values())[0] if params else ''
+
+def _render_alt_form(template) -> str:
+    # Alternative form templates - preserve the information
+    values = list(parse_template_params(template).values())
+    term = values[1] if len(values) > 1 else values[0] if values else ''
+    return f"Alternative form of {term}"
+
+def _render_link(template) -> str:
+    # Link templates - just extract the linked term
+    values = list(parse_template_params(template).values())
+    return values[1] if len(values) > 1 else values[0] if values else ''
+
+def _render_qualifier(template) -> str:
+    # Qualifier
+    return ' '.join(parse_template_params(template).values())
+
+# Template name -> replacement text for templates found in definition lines
+_DEFINITION_TEMPLATES = {
+    'lb': _render_labels,
+    'defdate': _render_defdate,
+    'ng': _render_non_gloss,
+    'def-uncertain': lambda template: '[uncertain]',
+    'alt form': _render_alt_form,
+    'alternative form of': _render_alt_form,
+    'altform': _render_alt_form,
+    'm': _render_link,
+    'l': _render_link,
+    'w': _render_link,
+    'taxfmt': _render_link,
+    'cog': _render_link,
+    'inh': _render_link,
+    'q': _render_qualifier,
+    'sup': lambda template: '',
+}
+
+def _render_definition_templates(code) -> None:
+    """
+    Swap each known template in code for its rendering, in one pass over the
+    node list (recursing into tags and links) rather than one Wikicode.replace
+    tree search per template. Renderings are parsed, since they can hold links.
+    """
+    nodes = []
+    for node in code.nodes:
+        if isinstance(node, Template):
+            render = _DEFINITION_TEMPLATES.get(str(node.name).strip())
+            if render is not None:
+                nodes.extend(mwparserfromhell.parse(render(node)).nodes)
+                continue
+        elif isinstance(node, Tag) and node.contents is not None:
+            _render_definition_templates(node.contents)
+        elif isinstance(node, Wikilink) and node.text is not None:
+            _render_definition_templates(node.text)
+        elif isinstance(node, ExternalLink) and node.title is not None:
+            _render_definition_templates(node.title)
+        nodes.append(node)
+    code.nodes = nodes
+
+def _strip_outer_whitespace(code) -> None:
+    """Trim the whitespace at both ends of code in place, like str(code).strip()."""
+    nodes = code.nodes
+    while nodes and isinstance(nodes[0], Text):
+        nodes[0].value = nodes[0].value.lstrip()
+        if nodes[0].value:
+            break
+        nodes.pop(0)
+    while nodes and isinstance(nodes[-1], Text):
+        nodes[-1].value = nodes[-1].value.rstrip()
+        if nodes[-1].value:
+            break
+        nodes.pop()
+
+@lru_cache(maxsize=4096)
+def _clean_definition(defn: str) -> str:
+    """Render one definition line's templates as readable text and strip the markup."""
+    # Parse the definition to clean up templates
+    defn_code = mwparserfromhell.parse(defn)
+    
+    _render_definition_templates(defn_code)
+    _strip_outer_whitespace(defn_code)
+    
+    # Remove any remaining HTML tags; the renderings were parsed when spliced
+    # in, so the edited tree can be stripped directly instead of being reparsed
+    return defn_code.strip_code()
+
 def extract_definitions(wikicode, level: int = 1) -> List[str]:
     """Extract definition lines (starting with #) at a specific nesting level."""
     definitions = []
-    text = str(wikicode)
     
-    for line in text.split('\n'):
-        # Count leading # characters
-        stripped = line.lstrip()
-        if not stripped.startswith('#'):
-            continue
+    for match in _def_line_pattern(level).finditer(str(wikicode)):
+        # Remove the # and clean up
+        defn = match.group(0)[1:].strip()
         
-        hash_count = len(line) - len(line.lstrip('#'))
-        if hash_count == level:
-            # Remove the # and clean up
-            defn = stripped[1:].strip()
-            
-            # Parse the definition to clean up templates
-            defn_code = mwparserfromhell.parse(defn)
-            
-            # Clean up common templates - iterate over a list copy to avoid modification issues
-            templates = list(defn_code.filter_templates())
-            for template in templates:
-                try:
-                    name = str(template.name).strip()
-                    if name == 'lb':
-                        # Labels like {{lb|egy|intransitive}}
-                        labels = [str(p.value).strip() for p in template.params[1:]]
-                        defn_code.replace(template, f"[{', '.join(labels)}]")
-                    elif name == 'defdate':
-                        params = parse_template_params(template)
-                        date_str = list(params.values())[0] if params else ''
-                        defn_code.replace(template, f"(dated: {date_str})")
-                    elif name == 'ng':
-                        # Non-gloss definition
-                        params = parse_template_params(template)
-                        defn_code.replace(template, list(params.values())[0] if params else '')
-                    elif name == 'def-uncertain':
-                        defn_code.replace(template, '[uncertain]')
-                    elif name in ['alt form', 'alternative form of', 'altform']:
-                        # Alternative form templates - preserve the information
-                        params = parse_template_params(template)
-                        values = list(params.values())
-                        term = values[1] if len(values) > 1 else values[0] if values else ''
-                        defn_code.replace(template, f"Alternative form of {term}")
-                    elif name in ['m', 'l', 'w', 'taxfmt', 'cog', 'inh']:
-                        # Link templates - just extract the linked term
-                        params = parse_template_params(template)
-                        values = list(params.values())
-                        defn_code.replace(template, values[1] if len(values) > 1 else values[0] if values else '')
-                    elif name == 'q':
-                        # Qualifier
-                        params = parse_template_params(template)
-                        defn_code.replace(template, ' '.join(params.values()))
-                    elif name == 'sup':
-                        defn_code.replace(template, '')
-                except (ValueError, AttributeError):
-                    # Template already replaced or other issue, skip
-                    pass
-            
-            # Remove any remaining HTML tags
-            clean_text = str(defn_code).strip()
-            clean_text = mwparserfromhell.parse(clean_text).strip_code()
-            
-            if clean_text:
-                definitions.append(clean_text)
+        clean_text = _clean_definition(defn)
+        
+        if clean_text:
+            definitions.append(clean_text)
     
     return definitions
 
@@ -140,7 +255,8 @@ def parse_pos_section(section_code, pos_name: str, subsection_level: int) -> Dic
     for template in section_code.filter_templates():
         name = str(template.name).strip()
         if name.startswith('egy-') or name.startswith('cop-') or name.startswith('dem-'):
-            if any(pos.lower() in name.lower() for pos in ['noun', 'verb', 'adj', 'adv', 'part', 'prep', 'pron', 'num', 'proper']):
+            lower_name = name.lower()
+            if any(pos in lower_name for pos in _POS_TEMPLATE_KEYWORDS):
                 params = parse_template_params(template)
                 # Join all parameters into a string
                 result['parameters'] = '|'.join(f"{k}={v}" if k else v for k, v in params.items())
@@ -153,8 +269,7 @@ def parse_pos_section(section_code, pos_name: str, subsection_level: int) -> Dic
     variant_forms_from_defs = []
     for defn in result['definitions']:
         # Pattern: "Alternative form of X"  or "Alternative spelling of X"
-        import re
-        match = re.search(r'(?:Alternative|Alternate)\s+(?:form|spelling|orthography)\s+of\s+(\S+)', defn, re.IGNORECASE)
+        match = _ALT_FORM_OF.search(defn)
         if match:
             variant_form = match.group(1).strip()
             # Clean up any remaining wiki markup
@@ -212,13 +327,12 @@ def parse_pos_section(section_code, pos_name: str, subsection_level: int) -> Dic
                     
                     # Last non-empty param might be a dialect
                     dialect = None
-                    dialect_names = ['Akhmimic', 'Bohairic', 'Sahidic', 'Fayyumic', 'Lycopolitan']
                     
                     # Find forms and potential dialect
                     forms_in_template = []
                     for val in forms_and_dialect:
                         if val:  # Non-empty
-                            if val in dialect_names:
+                            if val in _POS_ALTER_DIALECTS:
                                 dialect = val
                             else:
                                 forms_in_template.append(val)
@@ -270,7 +384,7 @@ def parse_pos_section(section_code, pos_name: str, subsection_level: int) -> Dic
                             if clean_v:
                                 derived.append(clean_v)
             if derived:
-                result['derived_terms'] = list(set(derived))
+                result['derived_terms'] = list(dict.fromkeys(derived))
         
         # Synonyms
         elif heading_text == 'Synonyms':
@@ -292,7 +406,7 @@ def parse_pos_section(section_code, pos_name: str, subsection_level: int) -> Dic
                             if clean_v:
                                 synonyms.append(clean_v)
             if synonyms:
-                result['synonyms'] = list(set(synonyms))
+                result['synonyms'] = list(dict.fromkeys(synonyms))
         
         # Descendants
         elif heading_text == 'Descendants':
@@ -320,8 +434,7 @@ def parse_pos_section(section_code, pos_name: str, subsection_level: int) -> Dic
                     level = level - 1  # * = level 0, ** = level 1, etc.
                     
                     # Find {{desc}} template in this line
-                    import re
-                    desc_match = re.search(r'\{\{desc\|(.+)\}\}', line)
+                    desc_match = _DESC_TEMPLATE.search(line)
                     if desc_match:
                         # Parse the desc template - need to handle nested templates carefully
                         template_content = desc_match.group(1)
@@ -387,7 +500,7 @@ def parse_pos_section(section_code, pos_name: str, subsection_level: int) -> Dic
                             if not words and 'tr' in named_params:
                                 tr_value = named_params['tr']
                                 # Extract word from {{l|lang|word}} template if present
-                                l_match = re.search(r'\{\{l\|[^|]+\|([^}|]+)', tr_value)
+                                l_match = _LINK_WORD.search(tr_value)
                                 if l_match:
                                     words.append(l_match.group(1).strip())
                                 else:
@@ -424,17 +537,26 @@ def parse_pos_section(section_code, pos_name: str, subsection_level: int) -> Dic
     
     return result
 
-def parse_etymology_section(wikicode, etym_num: Optional[int] = None, pos_level: int = 4) -> Dict:
-    """Parse a single etymology section."""
+def parse_etymology_section(wikicode, etym_num: Optional[int] = None, pos_level: int = 4,
+                            has_pos_headings: bool = True) -> Dict:
+    """
+    Parse a single etymology section.
+    
+    has_pos_headings=False means the page text contains no POS heading name,
+    so the POS section lookup is skipped.
+    """
     result = {
         'etymology_text': '',
         'definitions': [],
         'etymology_number': etym_num
     }
     
+    # Headed sections, split out once and filtered by title below
+    sections = wikicode.get_sections(include_lead=False)
+    
     # Extract alternative forms from etymology-level sections (common in Coptic)
     etym_alt_forms = []
-    alt_forms_sections = wikicode.get_sections(matches='Alternative forms')
+    alt_forms_sections = _sections_titled(sections, _heading_matcher('Alternative forms'))
     for alt_section in alt_forms_sections:
         for template in alt_section.filter_templates():
             name = str(template.name).strip()
@@ -447,14 +569,6 @@ def parse_etymology_section(wikicode, etym_num: Optional[int] = None, pos_level:
                 # Skip language code (first param)
                 forms_and_info = params[1:]
                 
-                # Dialect codes and full names
-                dialect_codes = {'L': 'Lycopolitan', 'A': 'Akhmimic', 'B': 'Bohairic', 
-                                'S': 'Sahidic', 'F': 'Fayyumic', 'P': 'Proto-Coptic',
-                                'V': 'Sub-Akhmimic'}
-                dialect_names = set(dialect_codes.values()) | {'Sahidic', 'Bohairic', 'Lycopolitan', 
-                                                                'Akhmimic', 'Fayyumic', 'Proto-Coptic',
-                                                                'Sub-Akhmimic'}
-                
                 # Parse parameters: form, optional gloss (empty), dialect codes/names
                 i = 0
                 while i < len(forms_and_info):
@@ -464,13 +578,13 @@ def parse_etymology_section(wikicode, etym_num: Optional[int] = None, pos_level:
                         continue
                     
                     # Check if this is a dialect code or name
-                    if form in dialect_codes:
+                    if form in _DIALECT_CODES:
                         # Single-letter code
                         if etym_alt_forms:
-                            dialect = dialect_codes[form]
+                            dialect = _DIALECT_CODES[form]
                             if 'dialect' not in etym_alt_forms[-1]:
                                 etym_alt_forms[-1]['dialect'] = dialect
-                    elif form in dialect_names:
+                    elif form in _DIALECT_NAMES:
                         # Full dialect name
                         if etym_alt_forms:
                             if 'dialect' not in etym_alt_forms[-1]:
@@ -482,7 +596,7 @@ def parse_etymology_section(wikicode, etym_num: Optional[int] = None, pos_level:
                         # Check next param for gloss (usually empty) or dialect
                         if i + 1 < len(forms_and_info):
                             next_param = forms_and_info[i + 1].strip()
-                            if next_param in dialect_codes or next_param in dialect_names:
+                            if next_param in _DIALECT_CODES or next_param in _DIALECT_NAMES:
                                 # Next param is dialect, will be handled in next iteration
                                 pass
                             elif next_param:
@@ -494,7 +608,7 @@ def parse_etymology_section(wikicode, etym_num: Optional[int] = None, pos_level:
     
     # Extract derived terms from etymology-level sections
     etym_derived = []
-    derived_sections = wikicode.get_sections(matches='Derived terms')
+    derived_sections = _sections_titled(sections, _heading_matcher('Derived terms'))
     for derived_section in derived_sections:
         for template in derived_section.filter_templates():
             name = str(template.name).strip()
@@ -511,7 +625,7 @@ def parse_etymology_section(wikicode, etym_num: Optional[int] = None, pos_level:
     # Extract etymology components (prefix, suffix, compound, etc.)
     etym_components = []
     etym_ancestors = []  # Track {{der}} templates for ancestry
-    etym_sections = wikicode.get_sections(matches='Etymology')
+    etym_sections = _sections_titled(sections, _heading_matcher('Etymology'))
     for etym_section in etym_sections:
         for template in etym_section.filter_templates():
             name = str(template.name).strip()
@@ -634,10 +748,7 @@ def parse_etymology_section(wikicode, etym_num: Optional[int] = None, pos_level:
     # Extract etymology text (before any POS sections)
     text_before_pos = []
     for node in wikicode.nodes:
-        if hasattr(node, 'title') and str(node.title).strip() in [
-            'Noun', 'Verb', 'Adjective', 'Adverb', 'Particle', 'Proper noun', 
-            'Preposition', 'Pronoun', 'Numeral', 'Letter'
-        ]:
+        if hasattr(node, 'title') and str(node.title).strip() in _ETYM_TEXT_END_HEADINGS:
             break
         text_before_pos.append(str(node))
     
@@ -653,44 +764,42 @@ def parse_etymology_section(wikicode, etym_num: Optional[int] = None, pos_level:
     if etym_ancestors:
         result['etymology_ancestors'] = etym_ancestors
     
-    # Get POS sections
-    pos_sections = wikicode.get_sections(levels=[pos_level])
+    # Get POS sections; each one starts with its own heading
+    if has_pos_headings:
+        pos_sections = [s for s in sections
+                        if s.nodes[0].level == pos_level and _is_pos_heading(s.nodes[0].title)]
+    else:
+        pos_sections = []
     
     for section in pos_sections:
-        headings = section.filter_headings()
-        if not headings:
-            continue
+        pos_name = str(section.nodes[0].title).strip()
+        pos_data = parse_pos_section(section, pos_name, pos_level + 1)
         
-        pos_name = str(headings[0].title).strip()
-        if pos_name in ['Noun', 'Verb', 'Adjective', 'Adverb', 'Particle', 'Proper noun', 
-                        'Preposition', 'Pronoun', 'Numeral', 'Letter', 'Determiner']:
-            pos_data = parse_pos_section(section, pos_name, pos_level + 1)
-            
-            # Add etymology-level alternative forms to this POS definition
-            if etym_alt_forms and 'alternative_forms' not in pos_data:
-                pos_data['alternative_forms'] = etym_alt_forms.copy()
-            elif etym_alt_forms and 'alternative_forms' in pos_data:
-                # Merge, avoiding duplicates
-                existing_forms = {f['form'] for f in pos_data['alternative_forms']}
-                for form in etym_alt_forms:
-                    if form['form'] not in existing_forms:
-                        pos_data['alternative_forms'].append(form)
-            
-            # Add etymology-level derived terms to this POS definition
-            if etym_derived and 'derived_terms' not in pos_data:
-                pos_data['derived_terms'] = etym_derived.copy()
-            elif etym_derived and 'derived_terms' in pos_data:
-                # Merge, avoiding duplicates
-                existing_derived = set(pos_data['derived_terms'])
-                for term in etym_derived:
-                    if term not in existing_derived:
-                        pos_data['derived_terms'].append(term)
-            
-            # Add etymology-level components to this POS definition
-            if etym_components and 'etymology_components' not in pos_data:
-                pos_data['etymology_components'] = etym_components.copy()
-            
-            result['definitions'].append(pos_data)
+        # Add etymology-level alternative forms to this POS definition
+        if etym_alt_forms and 'alternative_forms' not in pos_data:
+            pos_data['alternative_forms'] = etym_alt_forms.copy()
+        elif etym_alt_forms and 'alternative_forms' in pos_data:
+            # Merge, avoiding duplicates
+            existing_forms = {f['form'] for f in pos_data['alternative_forms']}
+            for form in etym_alt_forms:
+                if form['form'] not in existing_forms:
+                    pos_data['alternative_forms'].append(form)
+        
+        # Add etymology-level derived terms to this POS definition
+        if etym_derived and 'derived_terms' not in pos_data:
+            pos_data['derived_terms'] = etym_derived.copy()
+        elif etym_derived and 'derived_terms' in pos_data:
+            # Merge, avoiding duplicates
+            existing_derived = set(pos_data['derived_terms'])
+            for term in etym_derived:
+                if term not in existing_derived:
+                    pos_data['derived_terms'].append(term)
+        
+        # Add etymology-level components to this POS definition
+        if etym_components and 'etymology_components' not in pos_data:
+            pos_data['etymology_components'] = etym_components.copy()
+        
+        result['definitions'].append(pos_data)
     
     return result
 
@@ -707,21 +816,26 @@ def parse_wikitext(wikitext: str, language: str = 'Egyptian') -> Dict:
     }
     
     # Find the language section
-    sections = wikicode.get_sections(levels=[2])
-    lang_section = None
-    
-    for section in sections:
-        headings = section.filter_headings()
-        if headings and str(headings[0].title).strip() == language:
-            lang_section = section
-            break
+    lang_section = next(
+        (s for s in wikicode.get_sections(levels=[2])
+         if str(s.nodes[0].title).strip() == language),
+        None,
+    )
     
     if not lang_section:
         return result
     
+    # A POS heading's title is one of _POS_HEADINGS, so a page that never
+    # mentions any of them (pronunciation- or reference-only entries) has none
+    has_pos_headings = any(name in wikitext for name in _POS_HEADINGS)
+    
+    # Split the language section into its headed sections once and look up
+    # Pronunciation/Etymology/References by heading title, rather than
+    # re-walking the whole section for every lookup
+    sections = lang_section.get_sections(include_lead=False)
+    
     # Extract pronunciation
-    pronunciation_sections = lang_section.get_sections(matches='Pronunciation')
-    for pron_section in pronunciation_sections:
+    for pron_section in _sections_titled(sections, _heading_matcher('Pronunciation')):
         for template in pron_section.filter_templates():
             name = str(template.name).strip()
             if 'IPA' in name or 'pron' in name.lower():
@@ -729,32 +843,59 @@ def parse_wikitext(wikitext: str, language: str = 'Egyptian') -> Dict:
                 result['pronunciations'].append('|'.join(f"{k}={v}" for k, v in params.items()))
     
     # Check if there are etymology sections
-    etym_sections = lang_section.get_sections(matches=lambda x: 'Etymology' in str(x))
+    etym_sections = _sections_titled(sections, lambda x: 'Etymology' in str(x))
     
     if etym_sections and any('Etymology 1' in str(s) or 'Etymology 2' in str(s) for s in etym_sections):
         # Multiple etymologies - use level 4 (====) for POS
         for i in range(1, 20):  # Reasonable limit
             etym_title = f'Etymology {i}'
-            etym_section = lang_section.get_sections(matches=etym_title)
+            etym_section = _sections_titled(sections, _heading_matcher(etym_title))
             if etym_section:
-                parsed = parse_etymology_section(etym_section[0], etym_num=i, pos_level=4)
+                parsed = parse_etymology_section(etym_section[0], etym_num=i, pos_level=4,
+                                                 has_pos_headings=has_pos_headings)
                 result['etymologies'].append(parsed)
             else:
                 break
     else:
         # Single etymology or no explicit etymology section - use level 3 (===) for POS
-        parsed = parse_etymology_section(lang_section, pos_level=3)
+        parsed = parse_etymology_section(lang_section, pos_level=3, has_pos_headings=has_pos_headings)
         result['etymologies'].append(parsed)
     
     # Extract references
-    ref_sections = lang_section.get_sections(matches='References')
+    ref_sections = _sections_titled(sections, _heading_matcher('References'))
     if ref_sections:
-        result['references'] = str(ref_sections[0]).split('\n', 1)[1].strip() if '\n' in str(ref_sections[0]) else ''
+        # Everything after the heading line
+        ref_text = str(ref_sections[0])
+        newline = ref_text.find('\n')
+        result['references'] = ref_text[newline + 1:].strip() if newline != -1 else ''
     
     return result
 
-def main():
-    """Parse all Egyptian, Demotic, and Coptic lemma files."""
+# Parse-cache keys are salted with this file's contents and the mwparserfromhell
+# version, so editing the parser or upgrading the library invalidates every cached result
+_PARSER_DIGEST = hashlib.blake2b(
+    Path(__file__).read_bytes() + mwparserfromhell.__version__.encode('utf-8'), digest_size=16
+).digest()
+
+def _parse_cache_key(wikitext: str) -> bytes:
+    return hashlib.blake2b(wikitext.encode('utf-8'), digest_size=16, key=_PARSER_DIGEST).digest()
+
+def _open_parse_cache(path: Path) -> sqlite3.Connection:
+    """Open (creating if needed) a wikitext -> parse_wikitext() result cache."""
+    cache = sqlite3.connect(path)
+    cache.execute('CREATE TABLE IF NOT EXISTS cache (key BLOB PRIMARY KEY, value BLOB)')
+    return cache
+
+def main(processes: int = None, chunksize: int = 64, use_cache: bool = True):
+    """
+    Parse all Egyptian, Demotic, and Coptic lemma files.
+
+    Lemmas are parsed in a multiprocessing pool (processes=None uses every
+    core, processes=1 runs in-process); results come back in file order.
+    With use_cache, results are also kept in <language>_parse_cache.sqlite
+    next to the script, so re-runs only parse sections that changed, and
+    identical sections are parsed once per run.
+    """
     
     base_dir = Path(__file__).parent
     
@@ -776,46 +917,93 @@ def main():
         print(f"\nProcessing {input_file}...")
         print(f"Loading data...")
         
-        with open(input_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(input_path, 'rb') as f:
+            data = _json_loads(f.read())
         
         print(f"Found {len(data)} lemmas to parse...")
         
-        parsed_data = {}
+        # Get the appropriate section
+        section_key = f'{language.lower()}_section'
+        wikitexts = [content.get(section_key, content.get('full_wikitext', '')) for content in data.values()]
+        keys = [_parse_cache_key(wikitext) for wikitext in wikitexts]
         
-        for idx, (lemma, content) in enumerate(data.items()):
-            if (idx + 1) % 100 == 0:
-                try:
-                    print(f"Processing lemma {idx + 1}/{len(data)}: {lemma}")
-                except:
-                    print(f"Processing lemma {idx + 1}/{len(data)}")
-            
-            # Get the appropriate section
-            section_key = f'{language.lower()}_section'
-            wikitext = content.get(section_key, content.get('full_wikitext', ''))
-            
-            # Parse the wikitext
-            parsed = parse_wikitext(wikitext, language)
-            
-            # Add metadata
-            parsed['lemma'] = lemma
-            parsed['full_wikitext'] = content.get('full_wikitext', '')
-            parsed[section_key] = wikitext
-            
-            parsed_data[lemma] = parsed
+        # Sections already in the cache are read back from it; the rest are parsed
+        # once each, and results for sections that occur again are kept in memory
+        hits = set()
+        cache = _open_parse_cache(base_dir / f'{language.lower()}_parse_cache.sqlite') if use_cache else None
+        if cache is not None:
+            for key in keys:
+                if cache.execute('SELECT 1 FROM cache WHERE key = ?', (key,)).fetchone():
+                    hits.add(key)
+            print(f"{len(hits)} sections found in the parse cache")
+        to_parse = {key: wikitext for key, wikitext in zip(keys, wikitexts) if key not in hits}
+        repeated = {key for key, n in Counter(keys).items() if n > 1}
+        repeated_results = {}
+        
+        parse_one = partial(parse_wikitext, language=language)
+        if processes == 1:
+            pool = None
+            results = map(parse_one, to_parse.values())
+        else:
+            pool = Pool(processes)
+            results = pool.imap(parse_one, to_parse.values(), chunksize=chunksize)
         
-        # Save parsed data
-        print(f"Saving parsed data to {output_file}...")
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(parsed_data, f, ensure_ascii=False, indent=2)
+        # Stream each lemma to the output as it is parsed, so only one parsed
+        # lemma is held in memory; the file has the same layout as dumping the
+        # whole {lemma: parsed} dict with indent=2
+        print(f"Writing parsed data to {output_file}...")
+        count = 0
+        with open(output_path, 'wb') as out:
+            out.write(b'{')
+            try:
+                for idx, ((lemma, content), wikitext, key) in enumerate(zip(data.items(), wikitexts, keys)):
+                    if (idx + 1) % 100 == 0:
+                        try:
+                            print(f"Processing lemma {idx + 1}/{len(data)}: {lemma}")
+                        except:
+                            print(f"Processing lemma {idx + 1}/{len(data)}")
+                    
+                    if key in hits:
+                        row = cache.execute('SELECT value FROM cache WHERE key = ?', (key,)).fetchone()
+                        parsed = _json_loads(row[0])
+                    elif key in repeated_results:
+                        parsed = _json_loads(repeated_results[key])
+                    else:
+                        # to_parse is in first-occurrence order, so this is the next result
+                        parsed = next(results)
+                        if cache is not None or key in repeated:
+                            value = _dumps_json(parsed)
+                            if cache is not None:
+                                cache.execute('INSERT OR IGNORE INTO cache VALUES (?, ?)', (key, value))
+                            if key in repeated:
+                                repeated_results[key] = value
+                    
+                    # Add metadata
+                    parsed['lemma'] = lemma
+                    parsed['full_wikitext'] = content.get('full_wikitext', '')
+                    parsed[section_key] = wikitext
+                    
+                    out.write(b',\n  ' if count else b'\n  ')
+                    out.write(_dumps_json(lemma) + b': ' + _dumps_json(parsed).replace(b'\n', b'\n  '))
+                    count += 1
+            finally:
+                if pool is not None:
+                    pool.terminate()
+                if cache is not None:
+                    cache.commit()
+                    cache.close()
+            out.write(b'\n}' if count else b'}')
         
-        print(f"Done! Parsed {len(parsed_data)} lemmas.")
+        print(f"Done! Parsed {count} lemmas.")
         
-        # Show sample (skip due to encoding issues on Windows)
-        # if parsed_data:
-        #     first_lemma = next(iter(parsed_data.keys()))
+        # Show sample (skip due to encoding issues on Windows). To re-enable, keep the
+        # first (lemma, parsed) pair as `sample` in the write loop above. Only the head
+        # of each field is serialized, since the printout is cut to 500 characters.
+        # if sample:
+        #     first_lemma, first_parsed = sample
+        #     preview = {k: v[:200] if isinstance(v, (str, list)) else v for k, v in first_parsed.items()}
         #     print(f"\nSample parsed entry for '{first_lemma}':")
-        #     print(json.dumps(parsed_data[first_lemma], indent=2, ensure_ascii=False)[:500])
+        #     print(_dumps_json(preview).decode('utf-8')[:500])
         #     print("...\n")
 
 if __name__ == '__main__':
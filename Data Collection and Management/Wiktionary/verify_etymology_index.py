@@ -1,8 +1,8 @@
-import json
+from fast_json import loads as _json_loads
 
 # Load networks
-with open('lemma_networks_v2.json', 'r', encoding='utf-8') as f:
-    networks = json.load(f)
+with open('lemma_networks_v2.json', 'rb') as f:
+    networks = _json_loads(f.read())
 
 # Find ϣⲱϣ networks
 target_form = "ϣⲱϣ"
@@ -5,8 +5,8 @@ This script starts a local web server to view the network visualization.
 The visualization will be available at http://localhost:8000
 """
 
+import gzip
 import http.server
-import socketserver
 import webbrowser
 import os
 import shutil
@@ -23,23 +23,65 @@ json_source = script_dir.parent / 'lemma_networks.json'
 json_dest = script_dir / 'lemma_networks.json'
 
 if json_source.exists() and not json_dest.exists():
-    print(f"Copying lemma_networks.json to visualize directory...")
+    print("Copying lemma_networks.json to visualize directory...")
     shutil.copy2(json_source, json_dest)
-    print(f"✓ JSON file copied")
+    print("✓ JSON file copied")
+
+def fresh_gzip(path):
+    """The pre-compressed .gz next to path, if it exists and is not older than path."""
+    gz_path = path.with_name(path.name + '.gz')
+    if gz_path.exists() and gz_path.stat().st_mtime >= path.stat().st_mtime:
+        return gz_path
+    return None
+
+# Pre-compress the JSON files app.js fetches; the handler sends the .gz to
+# browsers that accept gzip
+for name in ('lemma_networks.json', 'lemma_networks_v2.json', 'egyptian_lemmas_parsed_mwp.json',
+             'demotic_lemmas_parsed_mwp.json', 'coptic_lemmas_parsed_mwp.json'):
+    json_path = script_dir / name
+    if json_path.exists() and fresh_gzip(json_path) is None:
+        print(f"Compressing {name}...")
+        json_path.with_name(name + '.gz').write_bytes(gzip.compress(json_path.read_bytes(), compresslevel=6))
+        print(f"✓ {name} compressed")
 
 class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+    # Content-Type comes from guess_type() with this map; pin .json so it does
+    # not depend on the platform's mimetypes registry
+    extensions_map = {**http.server.SimpleHTTPRequestHandler.extensions_map,
+                      '.json': 'application/json'}
+    
     def do_GET(self):
         # Redirect root to index.html
         if self.path == '/':
             self.path = '/index.html'
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            path = Path(self.translate_path(self.path))
+            if path.suffix == '.json' and path.is_file():
+                gz_path = fresh_gzip(path)
+                if gz_path is not None:
+                    return self.send_gzipped(gz_path)
         return super().do_GET()
     
+    def send_gzipped(self, gz_path):
+        """Send a pre-compressed JSON file with Content-Encoding: gzip."""
+        try:
+            f = open(gz_path, 'rb')
+        except OSError:
+            return super().do_GET()
+        with f:
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Content-Length', str(os.fstat(f.fileno()).st_size))
+            self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            shutil.copyfileobj(f, self.wfile)
+    
     def end_headers(self):
         # Add CORS headers to allow loading JSON
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET')
         self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate')
-        self.send_header('Content-Type', 'application/json' if self.path.endswith('.json') else self.guess_type(self.path))
         super().end_headers()
 
     def log_message(self, format, *args):
@@ -65,8 +107,9 @@ def main():
     except:
         print("⚠ Could not open browser automatically. Please open manually.\n")
     
-    # Start server
-    with socketserver.TCPServer(("", PORT), MyHTTPRequestHandler) as httpd:
+    # Start server; one thread per request, so the page and the large JSON
+    # files can load in parallel
+    with http.server.ThreadingHTTPServer(("", PORT), MyHTTPRequestHandler) as httpd:
         try:
             httpd.serve_forever()
         except KeyboardInterrupt:
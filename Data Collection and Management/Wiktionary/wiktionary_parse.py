@@ -4,6 +4,11 @@ import os
 import tempfile
 import logging
 
+try:
+    import orjson  # optional: faster JSON serialization
+except ImportError:
+    orjson = None
+
 # Set up logging
 logging.basicConfig(
     filename="test_parse_egyptian_lemma_errors.log",
@@ -11,9 +16,18 @@ logging.basicConfig(
     format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+# Patterns used for every lemma, compiled once
+_NEWLINES = re.compile(r'\n+')
+_TEMPLATE = re.compile(r'{{[^}]+}}')
+_EGY_H = re.compile(r'{{egy-h\|([^}]+)}}')
+_EGY_HIEROFORMS = re.compile(r'{{egy-hieroforms\|([^}]+)}}')
+_READ_PARAM = re.compile(r'read\d*=')
+_HEADER_SPLIT = re.compile(r'(===+[^=]+===+\n)')
+_HEADER = re.compile(r'===+[^=]+===+')
+
 def clean_text(text):
     """Clean text by removing extra newlines and leading/trailing whitespace."""
-    return re.sub(r'\n+', ' ', text.strip()).strip()
+    return _NEWLINES.sub(' ', text.strip()).strip()
 
 def extract_definitions(section_text):
     """Extract definitions from lines starting with '#' or within <li> tags."""
@@ -22,49 +36,38 @@ def extract_definitions(section_text):
     for line in lines:
         line = line.strip()
         if line.startswith('#'):
-            cleaned = re.sub(r'{{[^}]+}}', '', line).lstrip('# ').strip()
+            cleaned = _TEMPLATE.sub('', line).lstrip('# ').strip()
             if cleaned:
                 definitions.append(cleaned)
         elif line.startswith('<li>'):
-            cleaned = re.sub(r'{{[^}]+}}', '', line).lstrip('<li>').rstrip('</li>').strip()
+            cleaned = _TEMPLATE.sub('', line).lstrip('<li>').rstrip('</li>').strip()
             if cleaned:
                 definitions.append(cleaned)
     return definitions
 
 def extract_hieroglyphs(section_text):
     """Extract hieroglyph codes from egy-h and egy-hieroforms templates."""
-    hieroglyphs = []
     # Match egy-h templates
-    egy_h_matches = re.findall(r'{{egy-h\|([^}]+)}}', section_text)
-    for match in egy_h_matches:
-        hiero = match.strip()
-        if hiero and hiero not in hieroglyphs:
-            hieroglyphs.append(hiero)
+    hieroglyphs = [match.strip() for match in _EGY_H.findall(section_text)]
     
-    # Match egy-hieroforms templates
-    hieroforms_matches = re.findall(r'{{egy-hieroforms\|([^}]+)}}', section_text)
-    for match in hieroforms_matches:
-        params = match.split('|')
-        for param in params:
-            if not param.strip().startswith('read') and not param.strip().startswith('date') and not param.strip().startswith('note'):
-                hiero = param.strip()
-                if hiero and hiero not in hieroglyphs:
-                    hieroglyphs.append(hiero)
+    # Match egy-hieroforms templates; every parameter that is not readN/dateN/noteN is a writing
+    for match in _EGY_HIEROFORMS.findall(section_text):
+        for param in match.split('|'):
+            hiero = param.strip()
+            if not hiero.startswith(('read', 'date', 'note')):
+                hieroglyphs.append(hiero)
     
-    return hieroglyphs
+    # Drop empties and duplicates, keeping first occurrences
+    return [hiero for hiero in dict.fromkeys(hieroglyphs) if hiero]
 
 def extract_alternative_forms(section_text):
     """Extract alternative forms from egy-hieroforms templates."""
     forms = []
-    hieroforms_matches = re.findall(r'{{egy-hieroforms\|([^}]+)}}', section_text)
-    for match in hieroforms_matches:
-        params = match.split('|')
-        for param in params:
-            if param.strip().startswith('read'):
-                form = re.sub(r'read\d*=', '', param).strip()
-                if form and form not in forms:
-                    forms.append(form)
-    return forms
+    for match in _EGY_HIEROFORMS.findall(section_text):
+        for param in match.split('|'):
+            if param.lstrip().startswith('read'):
+                forms.append(_READ_PARAM.sub('', param).strip())
+    return [form for form in dict.fromkeys(forms) if form]
 
 def parse_egyptian_section(wikitext, title):
     """Parse the wikitext to extract structured data using regex."""
@@ -79,7 +82,7 @@ def parse_egyptian_section(wikitext, title):
     }
 
     # Split wikitext into sections based on headers (=== or ====)
-    sections = re.split(r'(===+[^=]+===+\n)', wikitext)
+    sections = _HEADER_SPLIT.split(wikitext)
     current_etymology = None
     pos_sections = [
         "noun", "verb", "particle", "symbol", "pronoun", "preposition",
@@ -89,7 +92,7 @@ def parse_egyptian_section(wikitext, title):
 
     i = 0
     while i < len(sections):
-        if re.match(r'===+[^=]+===+', sections[i]):
+        if _HEADER.match(sections[i]):
             header = sections[i].strip('=\n').lower()
             content = sections[i + 1] if i + 1 < len(sections) else ""
             logging.debug(f"Processing section: {header}")
@@ -127,7 +130,7 @@ def parse_egyptian_section(wikitext, title):
         i += 2
 
     # Extract hieroglyphs from the entire wikitext (to catch any missed in sections)
-    lemma_data["hieroglyphs"] = list(set(lemma_data["hieroglyphs"] + extract_hieroglyphs(wikitext)))
+    lemma_data["hieroglyphs"] = list(dict.fromkeys(lemma_data["hieroglyphs"] + extract_hieroglyphs(wikitext)))
     logging.debug(f"Total hieroglyphs extracted: {len(lemma_data['hieroglyphs'])}")
 
     # Clean up empty fields
@@ -144,8 +147,12 @@ def parse_egyptian_section(wikitext, title):
 
 def save_parsed_data(data, output_file):
     """Save parsed data to a JSON file with atomic write."""
-    with tempfile.NamedTemporaryFile(mode="w", encoding="utf-8", delete=False, suffix=".json") as temp_file:
-        json.dump(data, temp_file, ensure_ascii=False, indent=2)
+    if orjson is not None:
+        with tempfile.NamedTemporaryFile(mode="wb", delete=False, suffix=".json") as temp_file:
+            temp_file.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with tempfile.NamedTemporaryFile(mode="w", encoding="utf-8", delete=False, suffix=".json") as temp_file:
+            json.dump(data, temp_file, ensure_ascii=False, indent=2)
     
     try:
         os.replace(temp_file.name, output_file)